@@ -67,6 +67,10 @@ dico = {"app_title": "Classroom",
         "group_name": "Group name",
         "std_name": "Student name",
         "add_to_group": "Add to group:",
+        "import_by_group": "Groups from column:",
+        "import_group_column": "Class",
+        "import_group_column_not_found": "This column is not in the file",
+        "import_encoding_error": "The file encoding is not supported (UTF-8 or Windows-1252 expected)",
         "export_PNG": "Save an Image of the plan",
         "export_CSV": "Export the attributes' table to a CSV format",
 
@@ -98,6 +102,7 @@ dico = {"app_title": "Classroom",
         "acknowledge_changes": "Your changes have been saved",
 
         "faces_found": " faces found",
+        "imported_students": " students imported",
         "std_faces_match" : "Attention : The number of faces does not match the number of students<br>Retry the procedure by selecting on the plan all non detected students",
         "all_faces_ok": "All faces are detected<br>Shall we proceed ?",
         "action_import_photo" : "Photo import",
@@ -67,6 +67,10 @@ dico = {"app_title": "Salle de Classe",
         "group_name": "Nom du groupe",
         "std_name": "Nom/Prénom de l'élève",
         "add_to_group": "Ajouter au groupe :",
+        "import_by_group": "Groupes de la colonne :",
+        "import_group_column": "Classe",
+        "import_group_column_not_found": "Cette colonne n'est pas dans le fichier",
+        "import_encoding_error": "L'encodage du fichier n'est pas reconnu (UTF-8 ou Windows-1252 attendu)",
         "export_PNG": "Capturer et sauver le plan de classe",
         "export_CSV": "Exporter la table des attributs au format CSV",
 
@@ -98,6 +102,7 @@ dico = {"app_title": "Salle de Classe",
         "acknowledge_changes": "Vos modifications ont bien été prises en compte",
 
         "faces_found": " visages détectés",
+        "imported_students": " élèves importés",
         "std_faces_match": "Attention : Le nombre de visages ne correspond pas au nombre d'élèves<br>Recommencez en sélectionnant sur le plan les élèves non détectés",
         "all_faces_ok": "Tous les visages sont détectés<br>Voulez-vous poursuivre l'import ?",
         "action_import_photo": "Importer des photos",
@@ -0,0 +1,113 @@
+# Salle de classe by Lecluse DevCorp
+# Licence GPL-v3 - see LICENCE.txt
+#
+# Benchmark : per-frame paint time of the classroom canvas
+# Compares the former paint loop (colors, pens and fonts built from config strings read from ~/.SdCrc for each tile)
+# with the current ViewCanvas paintEvent using its prebuilt CanvasRenderStyle.
+#
+# Run from the repository root : python benchmarks/bench_canvas_paint.py [nb_frames]
+
+import os
+import sys
+from configparser import ConfigParser
+from time import perf_counter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide2.QtCore import QPoint, QRect, Qt, Signal, QObject
+from PySide2.QtGui import QPainter, QColor, QPen, QFont, QPixmap
+from PySide2.QtWidgets import QApplication
+
+from src.assets_manager import AssetManager
+from src.View.view_canvas import ViewCanvas, PADDING
+
+NB_DESKS = 40
+
+
+class Signals(QObject):
+    sig_move_animation_ended = Signal()
+    sig_select_tile = Signal()
+
+
+def legacy_config(section, key):
+    """Former AssetManager.config() : re-reads the config file for each lookup"""
+    config = ConfigParser()
+    config.read(AssetManager.getInstance().config_path)
+    return config.get(section, key)
+
+
+def legacy_paint(canvas, tiles, pixmap):
+    """Former paintEvent body (grid + tiles), reading the config for every tile"""
+    painter = QPainter(pixmap)
+    pen = QPen()
+    pen.setColor(QColor(legacy_config('colors', 'room_grid')))
+    pen.setWidth(2)
+    painter.setPen(pen)
+    for r in range(canvas.nb_rows):
+        painter.drawLine(QPoint(0, r * canvas.desk_h_size),
+                         QPoint(canvas.desk_w_size * canvas.nb_columns, r * canvas.desk_h_size))
+    for c in range(canvas.nb_columns):
+        painter.drawLine(QPoint(c * canvas.desk_w_size, 0),
+                         QPoint(c * canvas.desk_w_size, canvas.desk_h_size * canvas.nb_rows))
+
+    pen.setColor(QColor(legacy_config('colors', 'tile_text')))
+    painter.setPen(pen)
+    font = QFont()
+    font.setPixelSize(int(legacy_config('size', 'font_size')))
+    painter.setFont(font)
+
+    for i, (row, col, firstname, lastname) in enumerate(tiles):
+        key = 'selected_tile' if i % 5 == 0 else 'tile'
+        color = QColor(legacy_config('colors', key))
+        x, y = col * canvas.desk_w_size, row * canvas.desk_h_size
+        rect = QRect(QPoint(PADDING + x, PADDING + y), QPoint(x + canvas.desk_w_size - PADDING - 1,
+                                                              y + canvas.desk_h_size - PADDING - 1))
+        painter.fillRect(rect, color)
+        painter.drawText(rect, Qt.AlignCenter | Qt.TextWordWrap, f"{lastname}\n{firstname}")
+    painter.end()
+
+
+def time_frames(paint, nb_frames):
+    paint()  # warm up
+    start = perf_counter()
+    for _ in range(nb_frames):
+        paint()
+    return (perf_counter() - start) / nb_frames * 1000
+
+
+def main():
+    nb_frames = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    AssetManager.start_instance()
+    app = QApplication.instance() or QApplication(sys.argv)
+    signals = Signals()
+
+    canvas = ViewCanvas(signals.sig_move_animation_ended)
+    canvas.sig_select_tile = signals.sig_select_tile
+    canvas.config_mode(True)
+
+    tiles = []
+    for i in range(NB_DESKS):
+        row, col = divmod(i, canvas.nb_columns)
+        row %= canvas.nb_rows
+        tiles.append((row, col, f"Prenom{i}", f"NOM{i}"))
+        canvas.new_tile(row, col, i + 1, firstname=f"Prenom{i}", lastname=f"NOM{i}")
+        if i % 5 == 0:
+            canvas.change_desk_selection_by_desk_id(i + 1, True)
+
+    pixmap = QPixmap(canvas.size())
+
+    before = time_frames(lambda: legacy_paint(canvas, tiles, pixmap), nb_frames)
+    after = time_frames(lambda: canvas.render(pixmap), nb_frames)
+
+    print(f"{NB_DESKS} desks, {nb_frames} frames")
+    print(f"before (config strings per tile) : {before:8.3f} ms/frame")
+    print(f"after  (CanvasRenderStyle)       : {after:8.3f} ms/frame")
+    print(f"speedup                          : {before / after:8.1f}x")
+
+    del app
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# Salle de classe by Lecluse DevCorp
+# Licence GPL-v3 - see LICENCE.txt
+#
+# Stress test : GUI commits while the web server reads the database
+# A writer thread commits small changes (like desks added by clicks) while reader threads load the course roster
+# (like the /mobile page and the socket events). Compares the former connections (rollback journal, a new connection
+# by request) with the WAL connections and the pool of src.Model.bdd_connection.
+#
+# Run from the repository root : python benchmarks/bench_concurrent_access.py [duration_s]
+
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+from glob import glob
+from time import perf_counter, sleep
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.Model.bdd_connection import connect_bdd, ConnectionPool
+from src.Model.mod_bdd import ModBdd
+from src.Model.mod_migrations import migrate_bdd
+
+NB_READERS = 4
+NB_STUDENTS = 35
+WRITE_INTERVAL = 0.005  # Pause between two GUI commits, in seconds
+
+
+def create_bdd(bdd_path: str) -> None:
+    bdd = sqlite3.connect(bdd_path)
+    for sql_file in sorted(glob("src/SQL/create_*.sql")) + ["src/SQL/insert_Params.sql", "src/SQL/insert_Topics.sql"]:
+        with open(sql_file, encoding="utf-8") as f:
+            bdd.executescript(f.read())
+    migrate_bdd(bdd)
+    mod_bdd = ModBdd(bdd)
+    id_course = mod_bdd.create_course_with_name("stress")
+    id_group = mod_bdd.create_group("stress")
+    for i in range(NB_STUDENTS):
+        id_std = mod_bdd.insert_student_in_group_id(f"first{i}", f"last{i}", i, id_group)
+        mod_bdd.set_student_in_desk_by_id(id_std, mod_bdd.create_new_desk_in_course(i // 6, i % 6, id_course))
+    bdd.commit()
+    bdd.close()
+
+
+def percentile(values: list, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0
+
+
+def run(bdd_path: str, duration: float, legacy: bool) -> None:
+    write_times, read_times, errors = [], [], []
+    stop = threading.Event()
+
+    if legacy:
+        writer_bdd = sqlite3.connect(bdd_path, check_same_thread=False)
+        writer_bdd.execute("PRAGMA journal_mode=DELETE")
+    else:
+        writer_bdd = connect_bdd(bdd_path, check_same_thread=False)
+    pool = ConnectionPool(bdd_path)
+
+    def writer():
+        mod_bdd = ModBdd(writer_bdd)
+        i = 0
+        while not stop.is_set():
+            start = perf_counter()
+            try:
+                mod_bdd.create_new_desk_in_course(100 + i, 0, 1)
+                mod_bdd.commit()
+                write_times.append(perf_counter() - start)
+            except sqlite3.OperationalError as e:
+                writer_bdd.rollback()
+                errors.append(str(e))
+            i += 1
+            sleep(WRITE_INTERVAL)
+
+    def reader():
+        while not stop.is_set():
+            start = perf_counter()
+            try:
+                if legacy:
+                    ModBdd(sqlite3.connect(bdd_path)).get_course_snapshot(1)  # Never closed, as before
+                else:
+                    with pool.connection() as bdd:
+                        ModBdd(bdd).get_course_snapshot(1)
+                read_times.append(perf_counter() - start)
+            except sqlite3.OperationalError as e:
+                errors.append(str(e))
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(NB_READERS)]
+    for t in threads:
+        t.start()
+    stop.wait(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    pool.close()
+    writer_bdd.close()
+
+    print(f"{'legacy' if legacy else 'WAL + pool'} :")
+    print(f"  commits : {len(write_times):6}  p50 {percentile(write_times, 0.5) * 1000:7.2f} ms"
+          f"  p99 {percentile(write_times, 0.99) * 1000:7.2f} ms  max {max(write_times, default=0) * 1000:7.2f} ms")
+    print(f"  reads   : {len(read_times):6}  p50 {percentile(read_times, 0.5) * 1000:7.2f} ms"
+          f"  p99 {percentile(read_times, 0.99) * 1000:7.2f} ms  max {max(read_times, default=0) * 1000:7.2f} ms")
+    print(f"  errors  : {len(errors)} {errors[0] if errors else ''}")
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3
+    for legacy_mode in (True, False):
+        path = os.path.join(tempfile.mkdtemp(), "sdc_db")
+        create_bdd(path)
+        run(path, seconds, legacy_mode)
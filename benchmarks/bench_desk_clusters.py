@@ -0,0 +1,102 @@
+# Salle de classe by Lecluse DevCorp
+# Licence GPL-v3 - see LICENCE.txt
+#
+# Benchmark : desk clusters detection used by the sort by place actions, on a 40x40 amphitheatre
+# Compares the former recursive 8-neighbour flood fill with the union-find labeling of src.Model.room_grid.
+#
+# Run from the repository root : python benchmarks/bench_desk_clusters.py [nb_runs]
+
+import os
+import sys
+from time import perf_counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.Model.room_grid import find_clusters, clusters_layout
+
+ROOM_SIZE = 40
+
+
+def amphitheatre() -> np.ndarray:
+    """Rows of desks separated by an empty row, split in 4 blocks by aisles"""
+    room = np.zeros((ROOM_SIZE, ROOM_SIZE), dtype=np.int64)
+    room[::2, :] = 1
+    room[:, ::10] = 0
+    return room
+
+
+def lecture_hall() -> np.ndarray:
+    """Desks everywhere but on a winding aisle : a single cluster of more than 1000 desks"""
+    room = np.ones((ROOM_SIZE, ROOM_SIZE), dtype=np.int64)
+    room[:, ROOM_SIZE // 2] = 0
+    room[0, ROOM_SIZE // 2] = 1
+    return room
+
+
+def legacy_clusters(matrix: np.ndarray) -> dict:
+    """Former CourseController.sort_desks clusters search"""
+    max_row, max_col = matrix.shape
+    student_matrix = matrix.tolist()
+    clusters = dict()
+    visited = set()
+
+    def search_cluster(coords, row, col):
+        if not (0 <= row < max_row and 0 <= col < max_col):
+            return False
+        if (row, col) in visited:
+            return False
+        if student_matrix[row][col] == 0:
+            return False
+
+        if coords in clusters:
+            clusters[coords].append((row, col))
+        else:
+            clusters[coords] = [(row, col)]
+
+        visited.add((row, col))
+        search_cluster(coords, row - 1, col - 1)
+        search_cluster(coords, row - 1, col)
+        search_cluster(coords, row - 1, col + 1)
+        search_cluster(coords, row, col - 1)
+        search_cluster(coords, row, col + 1)
+        search_cluster(coords, row + 1, col - 1)
+        search_cluster(coords, row + 1, col)
+        search_cluster(coords, row + 1, col + 1)
+        return True
+
+    ro = 0
+    for r in range(max_row):
+        co = 0
+        empty = True
+        for c in range(max_col):
+            if search_cluster((ro, co), r, c):
+                co += 1
+                empty = False
+        if not empty:
+            ro += 1
+    return clusters
+
+
+def time_it(func, room, nb_runs: int) -> float:
+    """Mean time of a run, in ms"""
+    start = perf_counter()
+    for _ in range(nb_runs):
+        func(room)
+    return (perf_counter() - start) * 1000 / nb_runs
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    for name, layout in (("amphitheatre", amphitheatre()), ("lecture hall", lecture_hall())):
+        new_clusters = clusters_layout(find_clusters(layout != 0))
+        print(f"{name} {ROOM_SIZE}x{ROOM_SIZE} : {int(layout.sum())} desks, {len(new_clusters)} clusters")
+        try:
+            legacy_ms = time_it(legacy_clusters, layout, runs)
+            print(f"  recursive flood fill : {legacy_ms:8.2f} ms")
+        except RecursionError:
+            print(f"  recursive flood fill :   RecursionError (limit {sys.getrecursionlimit()})")
+        new_ms = time_it(lambda room: clusters_layout(find_clusters(room != 0)), layout, runs)
+        print(f"  union-find labeling  : {new_ms:8.2f} ms")
@@ -0,0 +1,97 @@
+# Salle de classe by Lecluse DevCorp
+# Licence GPL-v3 - see LICENCE.txt
+#
+# Benchmark : cost of reordering a group of students against the group size
+# Compares the former dense order keys (the whole group is rewritten 0, 1, 2...) with the sparse keys of
+# ModBdd.reorder_students. Like the sort actions of the GUI, the group is read with get_students_in_group before
+# being reordered (outside of the timings), so the current keys are known by ModBdd.
+# Actions : one student moved, a list already in order (sorting twice), a shuffled list, and 200 successive moves of
+# one student at the same place (the gap is exhausted and the keys are spread again).
+#
+# Run from the repository root : python benchmarks/bench_order_keys.py
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+from glob import glob
+from statistics import median
+from time import perf_counter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.Model.mod_bdd import ModBdd
+from src.Model.mod_migrations import migrate_bdd
+
+GROUP_SIZES = [30, 300, 3000]
+REPEAT = 15
+NB_MOVES = 200
+
+
+def create_group(nb_students: int) -> tuple:
+    bdd = sqlite3.connect(os.path.join(tempfile.mkdtemp(), "sdc_db"))
+    for sql_file in sorted(glob("src/SQL/create_*.sql")) + ["src/SQL/insert_Params.sql"]:
+        with open(sql_file, encoding="utf-8") as f:
+            bdd.executescript(f.read())
+    migrate_bdd(bdd)
+    mod_bdd = ModBdd(bdd)
+    id_group = mod_bdd.create_group("bench")
+    ids_std = mod_bdd.insert_students_in_group_id([(f"last{i}", f"first{i}") for i in range(nb_students)], id_group)
+    mod_bdd.commit()
+    return bdd, mod_bdd, list(ids_std)
+
+
+def dense_reorder(bdd, mod_bdd, ids_std: list) -> int:
+    """Former way : every order key is rewritten"""
+    bdd.executemany("UPDATE Students SET OrderKey = ? WHERE IdStudent = ?", [(o, i) for o, i in enumerate(ids_std)])
+    return len(ids_std)
+
+
+def sparse_reorder(bdd, mod_bdd, ids_std: list) -> int:
+    return mod_bdd.reorder_students(ids_std)
+
+
+def move_one(ids_std: list) -> list:
+    ids = list(ids_std)
+    ids.insert(len(ids) // 3, ids.pop(2 * len(ids) // 3))
+    return ids
+
+
+def in_order(ids_std: list) -> list:
+    return list(ids_std)
+
+
+def shuffle(ids_std: list) -> list:
+    ids = list(ids_std)
+    random.shuffle(ids)
+    return ids
+
+
+def measure(reorder, nb_students: int, action, nb_reorders: int = 1) -> tuple:
+    """Median time of a reorder (and its commit) in ms, and number of rows written by the last one"""
+    times = []
+    for _ in range(REPEAT):
+        bdd, mod_bdd, ids_std = create_group(nb_students)
+        elapsed = 0
+        for _ in range(nb_reorders):
+            ids_std = action(ids_std)
+            mod_bdd.get_students_in_group("bench")
+            start = perf_counter()
+            rows = reorder(bdd, mod_bdd, ids_std)
+            mod_bdd.commit()
+            elapsed += perf_counter() - start
+        times.append(elapsed * 1000 / nb_reorders)
+        bdd.close()
+    return median(times), rows
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    print(f"{'students':>9} {'action':>12} {'dense [ms]':>11} {'rows':>6} {'sparse [ms]':>12} {'rows':>6}")
+    for size in GROUP_SIZES:
+        for name, action, nb_reorders in (("move one", move_one, 1), ("in order", in_order, 1),
+                                          ("shuffle", shuffle, 1), (f"{NB_MOVES} moves", move_one, NB_MOVES)):
+            dense_ms, dense_rows = measure(dense_reorder, size, action, nb_reorders)
+            sparse_ms, sparse_rows = measure(sparse_reorder, size, action, nb_reorders)
+            print(f"{size:>9} {name:>12} {dense_ms:>11.3f} {dense_rows:>6} {sparse_ms:>12.3f} {sparse_rows:>6}")
@@ -0,0 +1,68 @@
+# Salle de classe by Lecluse DevCorp
+# Licence GPL-v3 - see LICENCE.txt
+#
+# Benchmark : cold-start import budget of the application
+# Runs `python -X importtime -c "import sdc"` in a fresh interpreter, reports the slowest top-level imports and
+# checks that the heavy optional dependencies are not imported at startup.
+#
+# Run from the repository root : python benchmarks/bench_startup_imports.py [budget_ms]
+# Exit code is 1 if the budget is exceeded or if a deferred dependency is imported at startup.
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+STARTUP_BUDGET_MS = 1500  # Total import time allowed for `import sdc`
+NB_REPORTED = 15
+
+# Modules that must only be imported when their feature is used
+DEFERRED_MODULES = ["cv2", "PIL", "flask", "flask_socketio", "eventlet", "socketio", "engineio", "pyqrcode",
+                    "requests", "numpy"]
+
+
+def measure_imports(module: str = "sdc") -> dict:
+    """
+    Imports the module in a fresh interpreter with -X importtime
+
+    :return: {imported module: (self time us, cumulative time us), ...}
+    """
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT, env=env,
+                          stderr=subprocess.PIPE, universal_newlines=True)
+    if proc.returncode != 0:
+        print(proc.stderr.splitlines()[-1])
+        sys.exit(2)
+
+    times = dict()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main():
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else STARTUP_BUDGET_MS
+    times = measure_imports()
+
+    total_ms = times["sdc"][1] / 1000 if "sdc" in times else sum(t[0] for t in times.values()) / 1000
+    top_level = [(name, t[1]) for name, t in times.items() if "." not in name]
+    top_level.sort(key=lambda x: x[1], reverse=True)
+
+    print(f"{'module':<40}{'cumulative [ms]':>16}")
+    for name, cumulative_us in top_level[:NB_REPORTED]:
+        print(f"{name:<40}{cumulative_us / 1000:>16.1f}")
+    print(f"{'TOTAL import sdc':<40}{total_ms:>16.1f}   (budget {budget:.0f} ms)")
+
+    eager = [m for m in DEFERRED_MODULES if m in times]
+    if eager:
+        print("Deferred dependencies imported at startup :", ", ".join(eager))
+
+    sys.exit(1 if total_ms > budget or eager else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,8 +7,9 @@ from PySide2.QtWidgets import QApplication
 from src.Controllers.main_controller import MainController
 
 from src.View.view_mainframe import EXIT_CODE_REBOOT
-from src.assets_manager import AssetManager, COLOR_DICT
-from src.webserver import flask_app
+from src.assets_manager import AssetManager
+from src.startup_profiler import StartupProfiler
+from src.Model.query_stats import QueryStats
 import logging
 import sys
 from os import path
@@ -45,22 +46,28 @@ def init_logger():
 
 def start_app():
 
+    profiler = StartupProfiler.getInstance()
     while True:
-        AssetManager.start_instance()
-        try:
-            app = QApplication(sys.argv)
-        except RuntimeError:
-            app = QtCore.QCoreApplication.instance()
-        flask = flask_app.FlaskThread()
-        ctrl = MainController()
-
-        exit_code = None
+        with profiler.phase("start"):
+            with profiler.phase("AssetManager"):
+                AssetManager.start_instance()
+            with profiler.phase("QApplication"):
+                try:
+                    app = QApplication(sys.argv)
+                except RuntimeError:
+                    app = QtCore.QCoreApplication.instance()
+            # The web server (flask, eventlet) is started in background by the controller once the window is shown
+            with profiler.phase("MainController"):
+                ctrl = MainController()
+
+            exit_code = None
+            if ctrl.mod_bdd is not None:
+                with profiler.phase("show main window"):
+                    ctrl.gui.show()
+        profiler.report()
+
         if ctrl.mod_bdd is not None:
-            flask.init_controller(ctrl)
-            ctrl.gui.show()
             exit_code = app.exec_()
-        else:
-            flask.stop_flask()
         if exit_code != EXIT_CODE_REBOOT:
             break
     return exit_code
@@ -68,5 +75,7 @@ def start_app():
 
 if __name__ == "__main__":
     init_logger()
+    StartupProfiler.getInstance().enable(sys.argv)
+    QueryStats.getInstance().enable(sys.argv)
     sys.exit(start_app())
 
@@ -8,7 +8,7 @@ from PySide2.QtGui import QColor
 from src.View.popup.view_confirm_dialogs import VConfirmDialog
 from src.View.popup.view_attribute_edition import VDlgEditText, VDlgEditCounter, VDlgEditMark, VDlgEditColor
 from src.View.popup.view_student_attributes import VStdAttributesDialog
-from src.assets_manager import AssetManager, COLOR_DICT
+from src.assets_manager import AssetManager, color_name
 from src.enumerates import EAttributesTypes
 
 import csv
@@ -41,7 +41,7 @@ class AttrController:
         :param attr_type: Attribute's type key
         """
         self.mod_bdd.insert_attribute(attr_name, attr_type)
-        self.__bdd.commit()
+        self.mod_bdd.commit()
 
         self.show_all_attributes()
 
@@ -55,7 +55,7 @@ class AttrController:
 
         for id_a in self.gui.sidewidget.attributes().selected_attributes():
             self.mod_bdd.delete_attribute_with_id(id_a)
-        self.__bdd.commit()
+        self.mod_bdd.commit()
         self.show_all_attributes()
 
     @Slot()
@@ -68,10 +68,7 @@ class AttrController:
         """
         if self.main_ctrl.std_dialog_info and self.main_ctrl.std_dialog_info.isVisible():
             id_topic = self.mod_bdd.get_topic_id_by_course_id(self.main_ctrl.id_course)
-            attrs = []
-            for attr_id, attr_name, attr_type in self.mod_bdd.get_all_attributes():
-                attrs.append((attr_id, attr_name,
-                              self.mod_bdd.get_attribute_value(self.main_ctrl.std_dialog_info.student.id, attr_id, id_topic)))
+            attrs = self.__get_student_attributes(self.main_ctrl.std_dialog_info.student.id, id_topic)
 
             self.main_ctrl.std_dialog_info.attributes_updated(attrs)
 
@@ -107,7 +104,7 @@ class AttrController:
 
         if dlg and dlg.exec_():
             self.mod_bdd.update_attr_with_ids(std_id, attr_id, id_topic, dlg.new_value())
-            self.__bdd.commit()
+            self.mod_bdd.commit()
             self.on_attribute_selection_changed()
 
     @Slot(tuple)
@@ -122,10 +119,8 @@ class AttrController:
         std = self.mod_bdd.get_student_by_desk_id(desk_id)
         topic = self.mod_bdd.get_topic_id_by_course_id(self.main_ctrl.id_course)
 
-        attrs = []
         if std is not None:
-            for attr_id, attr_name, attr_type in self.mod_bdd.get_all_attributes():
-                attrs.append((attr_id, attr_name, self.mod_bdd.get_attribute_value(std.id, attr_id, topic)))
+            attrs = self.__get_student_attributes(std.id, topic)
 
             if self.main_ctrl.std_dialog_info and self.main_ctrl.std_dialog_info.isVisible():  # Closes any opened info dialog
                 self.main_ctrl.std_dialog_info.close()
@@ -178,9 +173,7 @@ class AttrController:
                             except:
                                 row.append("")
                         elif attr_type[id_a] == EAttributesTypes.COLOR.value:
-                            hexcol = data[(id_a, id_s)].name().lower()
-                            col_name = COLOR_DICT[hexcol] if hexcol in COLOR_DICT else hexcol
-                            row.append(col_name)
+                            row.append(color_name(data[(id_a, id_s)].name()))
                         elif attr_type[id_a] == EAttributesTypes.COUNTER.value:
                             row.append(int(data[(id_a, id_s)]))
                     else:
@@ -193,6 +186,16 @@ class AttrController:
     # General methods
     #
 
+    def __get_student_attributes(self, id_std: int, id_topic: int) -> list:
+        """
+        Gets all the attributes values of a student
+
+        :return: [(attr_id, attr_name, value), ...]
+        """
+        all_attributes = self.mod_bdd.get_all_attributes()
+        values = self.mod_bdd.get_attributes_values([id_std], [a[0] for a in all_attributes], id_topic)
+        return [(attr_id, attr_name, values.get((attr_id, id_std), "")) for attr_id, attr_name, _ in all_attributes]
+
     def show_all_attributes(self):
         """Initializes the contents of the attributes list"""
 
@@ -231,34 +234,27 @@ class AttrController:
                 dlg = VDlgEditCounter(self.gui, "1")
 
             if dlg and dlg.exec_():
+                ids_std = [s[0] for s in students]
                 if attr_type == EAttributesTypes.COUNTER.value:
                     # lot change for counter attrs
                     if dlg.new_value() == 0 and not VConfirmDialog(self.gui, "confirm_message_RAZ").exec_():
                         return
-                    for s in students:
-                        if dlg.new_value() == 0:
-                            val = "0"
-                        else:
-                            val = self.mod_bdd.get_attribute_value(s[0], attr_id, id_topic)
-                            val = str(int(val) + dlg.new_value()) if val else str(dlg.new_value())
-                        self.mod_bdd.update_attr_with_ids(s[0], attr_id, id_topic, val)
+                    if dlg.new_value() == 0:
+                        self.mod_bdd.set_attributes_values(ids_std, attr_id, id_topic, "0")
+                    else:
+                        self.mod_bdd.increment_counter_attributes(ids_std, attr_id, id_topic, dlg.new_value())
                 elif attr_type == EAttributesTypes.MARK.value:
                     # lot change for marks attrs
                     if dlg.new_value() == "" and not VConfirmDialog(self.gui, "confirm_message_RAZ").exec_():
                         return
-                    for s in students:
-                        if dlg.new_value() == "":
-                            val = ""
-                        else:
-                            val = self.mod_bdd.get_attribute_value(s[0], attr_id, id_topic)
-                            val += " " + dlg.new_value()
-                        self.mod_bdd.update_attr_with_ids(s[0], attr_id, id_topic, val)
+                    if dlg.new_value() == "":
+                        self.mod_bdd.set_attributes_values(ids_std, attr_id, id_topic, "")
+                    else:
+                        self.mod_bdd.append_mark_attributes(ids_std, attr_id, id_topic, dlg.new_value())
                 else:
-                    for s in students:
-                        val = dlg.new_value()
-                        self.mod_bdd.update_attr_with_ids(s[0], attr_id, id_topic, val)
+                    self.mod_bdd.set_attributes_values(ids_std, attr_id, id_topic, dlg.new_value())
 
-                self.__bdd.commit()
+                self.mod_bdd.commit()
                 self.on_attribute_selection_changed()
 
     def get_attributes_matrix(self):
@@ -284,13 +280,12 @@ class AttrController:
 
             # get datas
             data = dict()
-            for a in attributes:
-                for s in students:
-                    val = self.mod_bdd.get_attribute_value(s[0], a[0], id_topic)
-                    if val:
-                        if len(val) == 7 and val[0] == '#':
-                            val = QColor(val)
-                        data[(a[0], s[0])] = val
+            values = self.mod_bdd.get_attributes_values([s[0] for s in students], [a[0] for a in attributes], id_topic)
+            for key, val in values.items():
+                if val:
+                    if len(val) == 7 and val[0] == '#':
+                        val = QColor(val)
+                    data[key] = val
 
             return attributes, students, data
         else:
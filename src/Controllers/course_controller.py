@@ -44,7 +44,7 @@ class CourseController:
                 id_desk = self.mod_bdd.create_new_desk_in_course(row, col, self.main_ctrl.id_course)
                 self.v_canvas.new_tile(row, col, id_desk)
 
-            self.__bdd.commit()
+            self.mod_bdd.commit()
             self.v_canvas.repaint()
         else:
             self.gui.status_bar.showMessage("Impossible : aucun cours sélectionné !")
@@ -54,8 +54,8 @@ class CourseController:
         """Moves a desk from start to end
         if end is out of the screen, we remove the desk"""
 
-        max_row = int(AssetManager.getInstance().config("size", "default_room_rows"))
-        max_col = int(AssetManager.getInstance().config("size", "default_room_columns"))
+        max_row = AssetManager.getInstance().config_int("size", "default_room_rows")
+        max_col = AssetManager.getInstance().config_int("size", "default_room_columns")
         if len(start) == 0:
             return
 
@@ -78,7 +78,7 @@ class CourseController:
         else:
             self.mod_bdd.remove_desk_by_id(id_desk_start)
             self.show_course()
-        self.__bdd.commit()
+        self.mod_bdd.commit()
         self.v_canvas.repaint()
 
     @Slot()
@@ -103,7 +103,7 @@ class CourseController:
             self.v_canvas.move_tile(d2.id, (d1.row, d1.col), True)
             i += 2
         if has_changed :
-            self.__bdd.commit()
+            self.mod_bdd.commit()
             self.v_canvas.repaint()
         else:
             # We re-enable shuffle and perspective buttons
@@ -120,7 +120,7 @@ class CourseController:
         :type new_topic: str
         """
         self.mod_bdd.set_topic_to_course_id(self.main_ctrl.id_course, new_topic)
-        self.__bdd.commit()
+        self.mod_bdd.commit()
         self.show_all_courses()
 
     @Slot(int)
@@ -145,18 +145,18 @@ class CourseController:
         """
 
         old_course_id = self.main_ctrl.id_course
-        self.set_course(new_course)
-        self.show_all_courses()
-        # Manually call the course changed update (manual set to selection does not trigger the signal emit)
-        self.on_course_changed(self.main_ctrl.id_course)
-
-        # Copy the Desk disposition of the old course_id
-        old_desks = self.mod_bdd.get_course_all_desks(old_course_id)
-        for d in old_desks:
-            id_desk = self.mod_bdd.create_new_desk_in_course(d.row, d.col, self.main_ctrl.id_course)
-            self.v_canvas.new_tile(d.row, d.col, id_desk)
+        with self.mod_bdd.transaction():  # The course is created with its desks or not at all
+            self.set_course(new_course)
+            self.show_all_courses()
+            # Manually call the course changed update (manual set to selection does not trigger the signal emit)
+            self.on_course_changed(self.main_ctrl.id_course)
+
+            # Copy the Desk disposition of the old course_id
+            old_desks = self.mod_bdd.get_course_all_desks(old_course_id)
+            for d in old_desks:
+                id_desk = self.mod_bdd.create_new_desk_in_course(d.row, d.col, self.main_ctrl.id_course)
+                self.v_canvas.new_tile(d.row, d.col, id_desk)
 
-        self.__bdd.commit()
         self.v_canvas.repaint()
 
     @Slot()
@@ -169,7 +169,7 @@ class CourseController:
 
         self.mod_bdd.delete_course_with_id(self.main_ctrl.id_course)
         self.main_ctrl.id_course = 0
-        self.__bdd.commit()
+        self.mod_bdd.commit()
         self.show_all_courses()
 
     @Slot(int, bool)
@@ -177,7 +177,7 @@ class CourseController:
         """updates the web interface when selection changes"""
         student = self.mod_bdd.get_student_by_desk_id(desk_id)
         if student is not None:
-            self.main_ctrl.flask_client.emit("selection_changed", {"id": student.id, "selected": selected})
+            self.main_ctrl.web_emit("selection_changed", {"id": student.id, "selected": selected})
 
         self.synchronize_canvas_selection_with_side_list()
 
@@ -273,48 +273,7 @@ class CourseController:
     def sort_desks(self, sort_type="Z"):
         """Sort students by their position
         detects clusters of students to make a clever sort"""
-
-        def build_matrix():
-            matrix = []
-            for row in range(max_row):
-                line = []
-                for col in range(max_col):
-                    id_desk = self.mod_bdd.get_desk_id_in_course_by_coords(self.main_ctrl.id_course, row, col)
-                    if id_desk != 0:
-                        student = self.mod_bdd.get_student_by_desk_id(id_desk)
-                        if student is not None:
-                            line.append(student.id)
-                        else:
-                            line.append(-1)  # empty desk
-                    else:
-                        line.append(0)  # no desk
-                matrix.append(line)
-            return matrix
-
-        def search_cluster(coords, row, col):
-            """search all cells in a cluster from row, col position"""
-            if not (0 <= row < max_row and 0 <= col < max_col):
-                return False
-            if (row, col) in visited:
-                return False
-            if student_matrix[row][col] == 0:
-                return False
-
-            if coords in clusters:
-                clusters[coords].append((row, col))
-            else:
-                clusters[coords] = [(row, col)]
-
-            visited.add((row, col))
-            search_cluster(coords, row - 1, col - 1)
-            search_cluster(coords, row - 1, col)
-            search_cluster(coords, row - 1, col + 1)
-            search_cluster(coords, row, col - 1)
-            search_cluster(coords, row, col + 1)
-            search_cluster(coords, row + 1, col - 1)
-            search_cluster(coords, row + 1, col)
-            search_cluster(coords, row + 1, col + 1)
-            return True
+        from src.Model.room_grid import RoomGrid, EMPTY_DESK, clusters_layout  # numpy is imported on first use
 
         def type_Z():
             # we sort the students using the clusters in a simple row by row pattern
@@ -323,7 +282,7 @@ class CourseController:
                 while (ir, ic) in clusters:
                     for coords in clusters[(ir, ic)]:
                         # we add all students in the cluster
-                        sortlist.append(student_matrix[coords[0]][coords[1]])
+                        sortlist.append(int(student_matrix[coords]))
                     ic += 1
                 ic = 0
                 ir += 1
@@ -346,7 +305,7 @@ class CourseController:
                         clusters[(ir, ic_alt)] = clusters[(ir, ic_alt)][::-1]
                     for coords in clusters[(ir, ic_alt)]:
                         # we add all students in the cluster
-                        sortlist.append(student_matrix[coords[0]][coords[1]])
+                        sortlist.append(int(student_matrix[coords]))
                 alt = not alt
                 ic = 0
                 ir += 1
@@ -364,35 +323,20 @@ class CourseController:
                     ir_alt = ir if alt else nb_rows - ir - 1
                     for coords in clusters[(ir_alt, ic)]:
                         # we add all students in the cluster
-                        sortlist.append(student_matrix[coords[0]][coords[1]])
+                        sortlist.append(int(student_matrix[coords]))
                 alt = not alt
                 ir = 0
                 ic += 1
 
         self.gui.status_bar.showMessage(tr("grp_action_sort_by_place"), 3000)
-        max_row = int(AssetManager.getInstance().config("size", "default_room_rows"))
-        max_col = int(AssetManager.getInstance().config("size", "default_room_columns"))
-        infty = max_row * max_col + 1
+        max_row = AssetManager.getInstance().config_int("size", "default_room_rows")
+        max_col = AssetManager.getInstance().config_int("size", "default_room_columns")
         group_name = self.mod_bdd.get_group_name_by_id(self.main_ctrl.id_group)
-        # First we initialize the sort key for the group to infty
-        group_students_id = self.mod_bdd.get_students_in_group(self.mod_bdd.get_group_name_by_id(self.main_ctrl.id_group))
-        for std in group_students_id:
-            self.mod_bdd.update_student_order_with_id(std.id, infty)
-
-        student_matrix = build_matrix()
-        clusters = dict()
-        visited = set()
-        # populating clusters dictionnary
-        ro = 0
-        for r in range(max_row):
-            co = 0
-            empty = True
-            for c in range(max_col):
-                if search_cluster((ro, co), r, c):
-                    co += 1
-                    empty = False
-            if not empty:
-                ro += 1
+
+        room = RoomGrid.load(self.mod_bdd, self.main_ctrl.id_course, max_row, max_col)
+        student_matrix = room.students
+        # clusters dictionnary {(cluster_row, cluster_col): [(row, col), ...], ...}
+        clusters = {coords: cluster.cells for coords, cluster in clusters_layout(room.clusters()).items()}
 
         # Now we get an ordered list of students matching the desk disposition
         sortlist = []  # this list is modified in one of the following function
@@ -403,15 +347,13 @@ class CourseController:
         else:
             type_U()
         # At last, we update the sort key to re-order the list
-        orderkey = 0
-        for s in sortlist:
-            if s != -1:
-                # -1 is an empty desk
-                self.mod_bdd.update_student_order_with_id(s, orderkey)
-                orderkey += 1
-        self.__bdd.commit()
-        self.main_ctrl.on_config_changed()
-        self.synchronize_canvas_selection_with_side_list()
+        # the students of the group who are not in the room go at the end of the list
+        placed_students = [s for s in sortlist if s != EMPTY_DESK]
+        placed = set(placed_students)
+        others = [std.id for std in self.mod_bdd.get_students_in_group(group_name) if std.id not in placed]
+        self.mod_bdd.reorder_students(placed_students + others)
+        self.mod_bdd.commit()
+        self.main_ctrl.refresh_students_list()
 
     def remove_desk_by_id(self, id_desk):
         """Removes the desk designed by id_desk
@@ -429,16 +371,15 @@ class CourseController:
             return
 
         desks_id = self.v_canvas.get_selected_tiles()
-        for d in desks_id:
-            id_student = self.mod_bdd.get_desk_by_id(d).id_student
-            if id_student == 0:
-                self.remove_desk_by_id(d)
-            else:
-                # We free the desk
-                self.v_canvas.set_student(d, "", "")
-                self.mod_bdd.set_student_in_desk_by_id(0, d)
-
-        self.__bdd.commit()
+        with self.mod_bdd.transaction():
+            for d in desks_id:
+                id_student = self.mod_bdd.get_desk_by_id(d).id_student
+                if id_student == 0:
+                    self.remove_desk_by_id(d)
+                else:
+                    # We free the desk
+                    self.v_canvas.set_student(d, "", "")
+                    self.mod_bdd.set_student_in_desk_by_id(0, d)
         self.synchronize_canvas_selection_with_side_list()
         self.v_canvas.repaint()
 
@@ -448,11 +389,9 @@ class CourseController:
         """Displays a the course defined by the id_course property"""
         self.v_canvas.delete_all_tiles()
         if self.main_ctrl.id_course > 0:
-            all_desks = self.mod_bdd.get_course_all_desks(self.main_ctrl.id_course)
-            for d in all_desks:
-                std = self.mod_bdd.get_student_by_id(d.id_student)
-                if std:
-                    self.v_canvas.new_tile(d.row, d.col, d.id, firstname=std.firstname, lastname=std.lastname)
+            for d in self.mod_bdd.get_course_snapshot(self.main_ctrl.id_course):
+                if d.id_student:
+                    self.v_canvas.new_tile(d.row, d.col, d.id, firstname=d.firstname, lastname=d.lastname)
                 else:
                     self.v_canvas.new_tile(d.row, d.col, d.id)
         if not self.gui.get_config():
@@ -486,7 +425,7 @@ class CourseController:
         """
         self.main_ctrl.id_course = self.mod_bdd.create_course_with_name(course_name)
         self.main_ctrl.selection_mode = self.main_ctrl.SEL_ALL
-        self.__bdd.commit()
+        self.mod_bdd.commit()
 
     def student_random_pick(self):
         """Randomly chooses a student among not selected ones"""
@@ -513,9 +452,11 @@ class CourseController:
         canditates = dict()
         colors = AssetManager.getInstance().config('colors', 'attr_colors').split()
 
+        desks_students = {d_id: self.mod_bdd.get_desk_by_id(d_id).id_student for d_id in desks_id}
+        values = self.mod_bdd.get_attributes_values(desks_students.values(), [id_attr], id_topic)
+
         for d_id in desks_id:
-            desk = self.mod_bdd.get_desk_by_id(d_id)
-            val = self.mod_bdd.get_attribute_value(desk.id_student, id_attr, id_topic)
+            val = values.get((id_attr, desks_students[d_id]), "")
             # Determine a order key depending on the attribute type
             if attr_type == EAttributesTypes.TEXT.value:
                 # for text attr, we select empty attributes first
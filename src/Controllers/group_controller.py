@@ -5,15 +5,13 @@ import tempfile
 
 from PySide2.QtCore import Slot
 from PySide2.QtWidgets import QFileDialog
-from src.Model.import_csv import import_csv, process_line
+from src.Model.import_csv import ColumnNotFoundError, import_csv, iter_names_by_group, process_line
 
 from src.View.popup.view_info_dialog import VInfoDialog
 from src.View.popup.view_import_csv import DialogImportCsv
 from src.View.popup.view_confirm_dialogs import VConfirmDialog
 
-from src.assets_manager import AssetManager, tr, get_photo_path
-import cv2
-from PIL import Image
+from src.assets_manager import AssetManager, tr, get_photo_path, update_student_thumbnails
 
 class GroupController:
     def __init__(self, main_ctrl, bdd):
@@ -78,7 +76,8 @@ class GroupController:
         elif prefix == 'std ':  # Student creation
             self.gui.status_bar.showMessage(f"Creation de l'élève {name}", 3000)
             lastname, firstname = process_line(name, ";")
-            self.mod_bdd.insert_student_in_group_id(firstname, lastname, 0, self.main_ctrl.id_group)
+            order = self.mod_bdd.get_next_order_in_group(self.main_ctrl.id_group)
+            self.mod_bdd.insert_student_in_group_id(firstname, lastname, order, self.main_ctrl.id_group)
             self.course_ctrl.show_course()
             self.show_all_groups(current=self.main_ctrl.id_group)
         else:  # Student edition
@@ -89,7 +88,7 @@ class GroupController:
             self.course_ctrl.show_course()
             self.show_all_groups(current=self.main_ctrl.id_group)
 
-        self.__bdd.commit()
+        self.mod_bdd.commit()
 
     def on_delete_group(self) -> None:
         """
@@ -98,9 +97,9 @@ class GroupController:
         if not VConfirmDialog(self.gui, "confirm_message_delete").exec_():
             return
 
-        self.mod_bdd.delete_group_by_id(self.main_ctrl.id_group)
+        with self.mod_bdd.transaction():
+            self.mod_bdd.delete_group_by_id(self.main_ctrl.id_group)
         self.main_ctrl.id_group = 0
-        self.__bdd.commit()
         self.show_all_groups()
         self.course_ctrl.show_course()
 
@@ -122,8 +121,9 @@ class GroupController:
 
     def auto_place(self):
         """Autoplacement of students on the free tiles"""
-        max_row = int(AssetManager.getInstance().config("size", "default_room_rows"))
-        max_col = int(AssetManager.getInstance().config("size", "default_room_columns"))
+        from src.Model.room_grid import RoomGrid  # numpy is imported on first use
+        max_row = AssetManager.getInstance().config_int("size", "default_room_rows")
+        max_col = AssetManager.getInstance().config_int("size", "default_room_columns")
         group_name = self.mod_bdd.get_group_name_by_id(self.main_ctrl.id_group)
         list_idstd = self.gui.sidewidget.students().selected_students()
         if not list_idstd:
@@ -134,18 +134,9 @@ class GroupController:
         students_ids = {s.id for s in list_students}
 
         to_be_placed = len(list_students)
-        list_available_desks = []
-        list_to_remove = []
-        for row in range(max_row):
-            for col in range(max_col):
-                id_desk = self.mod_bdd.get_desk_id_in_course_by_coords(self.main_ctrl.id_course, row, col)
-                if id_desk != 0:
-                    student = self.mod_bdd.get_student_by_desk_id(id_desk)
-                    if student is None:
-                        # We have a free spot
-                        list_available_desks.append((id_desk, row, col))
-                    else:
-                        list_to_remove.append(student.id)
+        room = RoomGrid.load(self.mod_bdd, self.main_ctrl.id_course, max_row, max_col)
+        list_available_desks = room.free_desks()
+        list_to_remove = room.placed_students()
         # Adjust the number of students to place
         for s in list_to_remove:
             if s in students_ids:
@@ -159,20 +150,19 @@ class GroupController:
             self.gui.status_bar.showMessage(tr("seats_are_OK"), 3000)
 
         index_std = 0
-        for dsk in list_available_desks:
-            while index_std < len(list_students) and list_students[index_std].id in list_to_remove:
+        with self.mod_bdd.transaction():
+            for dsk in list_available_desks:
+                while index_std < len(list_students) and list_students[index_std].id in list_to_remove:
+                    index_std += 1
+                if index_std >= len(list_students):
+                    break
+                student = list_students[index_std]
+                # update the model
+                self.mod_bdd.set_student_in_desk_by_id(student.id, dsk[0])
+                # update the view
+                self.v_canvas.set_student(dsk[0], student.firstname, student.lastname)
+                self.v_canvas.repaint()
                 index_std += 1
-            if index_std >= len(list_students):
-                break
-            student = list_students[index_std]
-            # update the model
-            self.mod_bdd.set_student_in_desk_by_id(student.id, dsk[0])
-            # update the view
-            self.v_canvas.set_student(dsk[0], student.firstname, student.lastname)
-            self.v_canvas.repaint()
-            index_std += 1
-
-        self.__bdd.commit()
 
         if info is not None:
             VInfoDialog(self.gui, info).exec_()
@@ -184,44 +174,70 @@ class GroupController:
         if dlg.exec_():
             name_group = dlg.selected_group()
             file_path = dlg.selected_file()
+            if dlg.group_column():
+                self.import_by_group(file_path, dlg.group_column())
+                return
             if name_group == "Nouveau Groupe":
                 f = file_path.split("/")[-1].upper()
                 name_group = f[0:f.index(".CSV")]
             csv_sep = AssetManager.getInstance().config("main", "csv_separator")
-            names = import_csv(file_path, csv_sep)
-            id_group = self.mod_bdd.create_group(name_group)
-            order = 0
-            for std in names:
-                self.mod_bdd.insert_student_in_group_id(std[1], std[0], order, id_group)
-                order += 1
-            self.__bdd.commit()
+            try:
+                names = import_csv(file_path, csv_sep)
+            except UnicodeDecodeError:
+                VInfoDialog(self.gui, tr("import_encoding_error")).exec_()
+                return
+            with self.mod_bdd.transaction():
+                id_group = self.mod_bdd.create_group(name_group)
+                # Students already in the group are not imported twice
+                ids_std = self.mod_bdd.insert_students_in_group_id(names, id_group, skip_duplicates=True)
+            self.gui.status_bar.showMessage(f"{len(ids_std)} / {len(names)}" + tr("imported_students"), 3000)
 
             self.show_all_groups()
 
+    def import_by_group(self, file_path: str, group_column: str) -> None:
+        """
+        Imports a school-wide csv file : the students are dispatched in the groups named in the group_column column,
+        created if needed.
+
+        :param file_path: csv file path
+        :param group_column: header or number (starting from 1) of the column of the groups
+        """
+        csv_sep = AssetManager.getInstance().config("main", "csv_separator")
+        try:
+            rows = iter_names_by_group(file_path, csv_sep, group_column)
+            counts = self.mod_bdd.insert_students_by_group(rows, skip_duplicates=True)
+        except ColumnNotFoundError:
+            VInfoDialog(self.gui, tr("import_group_column_not_found")).exec_()
+            return
+        except UnicodeDecodeError:
+            VInfoDialog(self.gui, tr("import_encoding_error")).exec_()
+            return
+        self.mod_bdd.commit()
+
+        self.show_all_groups()
+        report = [f"{sum(counts.values())}{tr('imported_students')}"]
+        report += [f"{group_name} : {nb}" for group_name, nb in counts.items()]
+        VInfoDialog(self.gui, "<br>".join(report)).exec_()
+
     def killstudent(self):
         if not VConfirmDialog(self.gui, "confirm_message_delete").exec_():
             return
 
         self.gui.status_bar.showMessage(tr("grp_action_del_student"), 3000)
         list_id_students = self.gui.sidewidget.students().selected_students()
-        for id_std in list_id_students:
-            self.mod_bdd.remove_student_from_group(id_std, self.main_ctrl.id_group)
+        with self.mod_bdd.transaction():
+            self.mod_bdd.remove_students_from_group(list_id_students, self.main_ctrl.id_group)
         self.course_ctrl.show_course()
         self.show_all_groups(current=self.main_ctrl.id_group)
-        self.__bdd.commit()
 
     def sort_alpha(self, desc):
         self.gui.status_bar.showMessage(tr("grp_action_alpha_sort"), 3000)
         list_students = self.mod_bdd.get_students_in_course_by_id(self.main_ctrl.id_course)
         sortlist = [(s.lastname, s.id) for s in list_students]
         sortlist.sort(reverse=desc)
-        orderkey = 1
-        for s in sortlist:
-            self.mod_bdd.update_student_order_with_id(s[1], orderkey)
-            orderkey += 1
-        self.__bdd.commit()
-        self.main_ctrl.on_config_changed()
-        self.course_ctrl.synchronize_canvas_selection_with_side_list()
+        self.mod_bdd.reorder_students([s[1] for s in sortlist])
+        self.mod_bdd.commit()
+        self.main_ctrl.refresh_students_list()
 
     def import_photos(self):
         """Import photos from a group photo"""
@@ -231,15 +247,19 @@ class GroupController:
             return
         photo_path = get_photo_path()
 
+        # OpenCV and PIL are heavy to import, we only load them when photos are imported
+        import cv2
+        from PIL import Image
+
         img = cv2.imread(trombinoscope)
         # convert image to grayscale
         grey_img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
         col_img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
 
         IA_model = AssetManager.getInstance().config("photos", "IA_model")
-        scaleFactor = float(AssetManager.getInstance().config("photos", "scaleFactor"))
-        zoomFace = float(AssetManager.getInstance().config("photos", "zoomFace"))
-        minNeighbors = int(AssetManager.getInstance().config("photos", "minNeighbors"))
+        scaleFactor = AssetManager.getInstance().config_float("photos", "scaleFactor")
+        zoomFace = AssetManager.getInstance().config_float("photos", "zoomFace")
+        minNeighbors = AssetManager.getInstance().config_int("photos", "minNeighbors")
         minSize = eval(AssetManager.getInstance().config("photos", "minSize"))
 
         # Face detection
@@ -253,15 +273,10 @@ class GroupController:
 
         self.gui.status_bar.showMessage(str(len(faces)) + tr("faces_found"), 3000)
 
-        # Get all unselected desks for photo matching
-        all_desks = self.mod_bdd.get_course_all_desks(self.main_ctrl.id_course)
+        # Get all unselected desks for photo matching, in the students order
+        all_desks = self.mod_bdd.get_course_snapshot(self.main_ctrl.id_course)
         selected_desks_id = self.v_canvas.get_selected_tiles()
-        stdid_to_import = [(d.id_student, self.mod_bdd.get_student_order_by_id(d.id_student))
-                           for d in all_desks if d.id not in selected_desks_id and d.id_student != 0]
-
-        # now we can import faces in png files
-        # first we sort the student list
-        stdid_to_import.sort(key=lambda x:x[1])
+        stdid_to_import = [d.id_student for d in all_desks if d.id not in selected_desks_id and d.id_student != 0]
 
         # We draw a frame around the faces
         dico_sort = dict()
@@ -316,5 +331,8 @@ class GroupController:
                         keys_in_row.append(k)
                 keys_in_row.sort()
                 for k in keys_in_row:
-                    dico_sort[k].save(photo_path + str(stdid_to_import[id_img][0]) + ".png")
-                    id_img += 1
\ No newline at end of file
+                    dico_sort[k].save(photo_path + str(stdid_to_import[id_img]) + ".png")
+                    id_img += 1
+
+            # The photos changed on the disk, generate their thumbnails and forget the cached ones
+            update_student_thumbnails(stdid_to_import)
\ No newline at end of file
@@ -2,12 +2,13 @@
 # file author : Olivier Lecluse
 # Licence GPL-v3 - see LICENCE.txt
 
-import sqlite3
+import logging
 
-from PySide2.QtCore import QObject, Signal, Slot
+from PySide2.QtCore import QObject, QThread, QTimer, Signal, Slot
 
 from src.View.popup.view_info_dialog import VInfoDialog
 from src.assets_manager import AssetManager, tr
+from src.startup_profiler import StartupProfiler
 
 # Secondary controllers
 from src.Controllers.course_controller import CourseController
@@ -15,17 +16,79 @@ from src.Controllers.group_controller import GroupController
 from src.Controllers.attr_controller import AttrController
 
 # Views
+from src.Model.bdd_connection import connect_bdd
 from src.Model.mod_bdd import ModBdd
+from src.Model.query_stats import QueryStats
+from src.Model.mod_migrations import migrate_bdd
 from src.View.view_mainframe import ViewMainFrame, EXIT_CODE_REBOOT
 from src.View.widgets.view_menubutton import ViewMenuButton
 from src.View.popup.view_student_attributes import VStdAttributesDialog
 from src.View.popup.view_confirm_dialogs import VConfirmDialog
 from src.View.popup.view_qrcode import VQRCode
-from PySide2.QtWidgets import QFileDialog
+from PySide2.QtGui import QKeySequence
+from PySide2.QtWidgets import QFileDialog, QShortcut
 
 from os import path
-# web sockets
-import socketio
+from time import sleep, perf_counter
+
+WEB_SERVER_CONNECT_RETRIES = 50  # Attempts to connect to the starting web server, every 0.1 s
+DEBUG_SHORTCUT = "Ctrl+Shift+D"  # Writes the debug information in the log
+
+
+class VersionCheckThread(QThread):
+
+    def __init__(self, sig_latest_version):
+        """
+        Looks for the latest released version without blocking the GUI
+
+        :param sig_latest_version: Signal to emit with the latest version found
+        :type sig_latest_version: Signal
+        """
+        QThread.__init__(self)
+        self.__sig_latest_version = sig_latest_version
+
+        self.start()
+
+    def run(self):
+        start = perf_counter()
+        latest_version = AssetManager.getInstance().get_latest_version()
+        StartupProfiler.getInstance().record("version check (background)", perf_counter() - start)
+        self.__sig_latest_version.emit(latest_version)
+
+
+class WebServerThread(QThread):
+
+    def __init__(self, controller):
+        """
+        Starts the web server for the mobile interface and connects the controller to it, without blocking the GUI :
+        flask, eventlet and socketio are heavy to import and the server takes some time to listen.
+
+        :type controller: MainController
+        """
+        QThread.__init__(self)
+        self.__controller = controller
+
+        self.start()
+
+    def run(self):
+        start = perf_counter()
+        import socketio
+        from src.webserver import flask_app
+
+        if flask_app.flask_thread is None:  # The server survives the application reboots
+            flask_app.flask_thread = flask_app.FlaskThread()
+        flask_app.flask_thread.init_controller(self.__controller)
+
+        client = socketio.Client()
+        url = 'http://localhost:' + AssetManager.getInstance().config('webapp', 'port')
+        for _ in range(WEB_SERVER_CONNECT_RETRIES):
+            try:
+                client.connect(url)
+                self.__controller.flask_client = client
+                break
+            except socketio.exceptions.ConnectionError:
+                sleep(0.1)  # Server is not listening yet
+        StartupProfiler.getInstance().record("web server start (background)", perf_counter() - start)
 
 
 class MainController(QObject):
@@ -68,14 +131,18 @@ class MainController(QObject):
 
     sig_config_mode_changed = Signal()
 
+    sig_latest_version = Signal(str)
+
     def __init__(self):
         """
         Application main controller.
         """
         QObject.__init__(self)
+        profiler = StartupProfiler.getInstance()
         # Create the Views
         self.gui = ViewMainFrame(self.sig_quit, self.sig_config_mode_changed, self.sig_export_csv)
         self.v_canvas = self.gui.central_widget.classroom_tab.v_canvas
+        profiler.lap("views")
 
         # BDD connection
         bdd_path, bdd_exists = AssetManager.getInstance().bdd_path()
@@ -86,7 +153,7 @@ class MainController(QObject):
                 return
             bdd_path = path.normpath(bp + "/sdc_db")
             if path.isfile(bdd_path):
-                self.__bdd = sqlite3.connect(bdd_path)
+                self.__bdd = connect_bdd(bdd_path)
             else:
                 # we initialize a new BDD
                 if not VConfirmDialog(self.gui, "confirm_db_creation").exec_():
@@ -97,14 +164,17 @@ class MainController(QObject):
             config.set('main', 'bdd_path', bdd_path)
             AssetManager.getInstance().save_config(config)
         else:
-            self.__bdd = sqlite3.connect(bdd_path)
+            self.__bdd = connect_bdd(bdd_path)
+        migrate_bdd(self.__bdd)
         self.mod_bdd = ModBdd(self.__bdd)
         self.gui.set_bdd_version(self.mod_bdd.get_version())
+        profiler.lap("database open")
 
         # Create secondary controllers
         self.attr_ctrl = AttrController(self, self.__bdd)
         self.course_ctrl = CourseController(self, self.__bdd)
         self.group_ctrl = GroupController(self, self.__bdd)
+        profiler.lap("secondary controllers")
 
         # Plugs the signals into the views
         self.v_canvas.sig_select_tile = self.sig_select_tile
@@ -153,6 +223,9 @@ class MainController(QObject):
         self.sig_config_mode_changed.connect(self.on_config_changed)
         self.sig_export_csv.connect(self.attr_ctrl.export_csv)
         self.sig_canvas_get_std_id.connect(self.set_std_id_to_canvas)
+        self.sig_latest_version.connect(self.on_latest_version)
+        if QueryStats.getInstance().enabled:
+            QShortcut(QKeySequence(DEBUG_SHORTCUT), self.gui).activated.connect(self.debug)
 
         self.actions_table = {  # Action buttons
             "import_csv": self.group_ctrl.import_pronote,
@@ -184,23 +257,30 @@ class MainController(QObject):
         self.filter_selection = False
         self.std_dialog_info: VStdAttributesDialog = None
         self.qr_dialog: VQRCode = None
+        profiler.lap("signals and actions")
 
         # initialize the views
         self.course_ctrl.show_all_courses()
+        profiler.lap("show all courses")
         self.group_ctrl.show_all_groups()
+        profiler.lap("show all groups")
         self.attr_ctrl.show_all_attributes()
+        profiler.lap("show all attributes")
         self.gui.on_config_mode(False)
         self.gui.update()
+        profiler.lap("views update")
 
-        # initialize connection to flask server
-        self.flask_client = socketio.Client()
-        self.flask_client.connect('http://localhost:'+AssetManager.getInstance().config('webapp', 'port'))
+        # flask server and its client connection are started in background once the window is shown
+        self.flask_client = None
         self.flask_server = None
+        self.web_server_thread = None
+        QTimer.singleShot(0, self.start_web_server)
 
-        # search for new version
-        latest_version = AssetManager.getInstance().get_latest_version()
-        if latest_version > AssetManager.getInstance().config('main', 'version'):
-            self.gui.status_bar.showMessage(tr("new_version") + latest_version)
+        # search for new version in background
+        self.version_thread = None
+        if AssetManager.getInstance().version_check_enabled():
+            self.version_thread = VersionCheckThread(self.sig_latest_version)
+            profiler.lap("version check start")
 
     #
     # Signals handling
@@ -214,27 +294,55 @@ class MainController(QObject):
         :param action_key: action triggered key
         :type action_key: str
         """
+        # The actions open their transactions around their writes only, once the user has answered their dialogs :
+        # an open write transaction would block the web server and any other writer while a dialog is shown.
+        commit_count = self.mod_bdd.commit_count
         self.actions_table[action_key]()
+        logging.getLogger("BDD").debug(f"Action {action_key} : {self.mod_bdd.commit_count - commit_count} commit(s)")
 
     @Slot()
     def do_quit(self, exit_code):
         self.v_canvas.application_closing()
+        if self.version_thread is not None:
+            self.version_thread.wait()  # A running QThread must not be destroyed
+        if self.web_server_thread is not None:
+            self.web_server_thread.wait()
         self.__bdd.close()
+        if QueryStats.getInstance().enabled:
+            QueryStats.getInstance().report()
         if exit_code != EXIT_CODE_REBOOT:
-            self.flask_client.emit("stop-server")
+            self.web_emit("stop-server")
 
     @Slot()
     def close_qr(self):
         if self.qr_dialog and self.qr_dialog.isVisible():
             self.qr_dialog.close()
 
+    @Slot(str)
+    def on_latest_version(self, latest_version: str) -> None:
+        """
+        Triggered when the background release check is done. Notifies the user if a new version is available
+        """
+        if latest_version > AssetManager.getInstance().config('main', 'version'):
+            self.gui.status_bar.showMessage(tr("new_version") + latest_version)
+
     @Slot()
     def on_config_changed(self):
         """
         Triggered when the user switched configuration mode
         Refresh the student list
         """
+        self.refresh_students_list()
 
+    #
+    # General methods
+    #
+
+    def refresh_students_list(self):
+        """
+        Refresh the students list : the current group in configuration mode, the students of the course otherwise.
+        The selection of the canvas is reported in the list.
+        """
         if self.gui.get_config():
             # Mode config is on, push group list
             current_group = self.mod_bdd.get_group_name_by_id(self.id_group)
@@ -245,16 +353,18 @@ class MainController(QObject):
             self.gui.sidewidget.students().set_students_list(students_in_course)
         self.course_ctrl.synchronize_canvas_selection_with_side_list()
 
-    #
-    # General methods
-    #
-
+    @Slot()
     def debug(self):
-        self.gui.status_bar.showMessage("ouaf")
+        """
+        Writes the SQL requests statistics in the log (when the instrumentation is enabled)
+        """
+        if QueryStats.getInstance().enabled:
+            QueryStats.getInstance().report()
+            self.gui.status_bar.showMessage(f"SQL stats : {path.expanduser('~/sdc.log')}", 3000)
 
     def initialize_bdd(self, bdd_path):
         """Initializes a new database"""
-        connection = sqlite3.connect(bdd_path)
+        connection = connect_bdd(bdd_path)
         cursor = connection.cursor()
         sql_files = ["create_Attributes.sql",  "create_Params.sql",  "create_Courses.sql", "create_Desks.sql",
                      "create_Groups.sql", "create_isIn.sql",  "create_StdAttrs.sql", "create_Students.sql",  "create_Topics.sql",
@@ -269,6 +379,23 @@ class MainController(QObject):
         connection.commit()
         return connection
 
+    @Slot()
+    def start_web_server(self) -> None:
+        """
+        Starts the web server for the mobile interface in background (see WebServerThread).
+        Called by the event loop once the main window is shown, so that bookmarked /mobile pages work at once.
+        After a reboot, the running web server is plugged to this controller.
+        """
+        if self.web_server_thread is None:
+            self.web_server_thread = WebServerThread(self)
+
+    def web_emit(self, event: str, data=None) -> None:
+        """
+        Sends an event to the web server, once its client connection is established
+        """
+        if self.flask_client is not None:
+            self.flask_client.emit(event, data)
+
     def show_qr(self):
         self.qr_dialog = VQRCode(self.gui)
         if self.qr_dialog.has_internet:
@@ -0,0 +1,123 @@
+# Salle de classe by Lecluse DevCorp
+# Licence GPL-v3 - see LICENCE.txt
+#
+# Database connections
+#
+# On a local disk, the database is used in WAL mode : the web server threads read while the GUI writes, without
+# blocking each other. WAL needs shared memory between the processes, it does not work on a database stored on a
+# network share : there (or when it can't be told, or when SDC_NO_WAL is set), the rollback journal is kept.
+# The journal mode is stored in the database file, so it is set again each time the application opens the database.
+
+from contextlib import contextmanager
+import logging
+from os import path, environ
+import sqlite3
+import sys
+import threading
+
+BUSY_TIMEOUT = 5.0  # Time to wait for a lock held by another connection, in seconds
+MAX_IDLE_CONNECTIONS = 4  # Connections kept open by thread in a ConnectionPool
+NO_WAL_ENV = "SDC_NO_WAL"  # Set this environment variable to keep the rollback journal
+NETWORK_FS_TYPES = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "afs", "9p", "ncpfs", "davfs", "fuse.sshfs"}
+
+
+def is_local_path(bdd_path: str) -> bool:
+    """
+    Tells if the file is on a local disk (Windows and Linux). False on a network share, or if it can't be told.
+    """
+    folder = path.dirname(path.realpath(path.expanduser(bdd_path)))
+    try:
+        if sys.platform == "win32":
+            if folder.startswith("\\\\"):  # UNC path
+                return False
+            import ctypes
+            drive_type = ctypes.windll.kernel32.GetDriveTypeW(path.splitdrive(folder)[0] + "\\")
+            return drive_type in (2, 3, 6)  # Removable, fixed or RAM disk (4 is a network drive)
+        if sys.platform.startswith("linux"):
+            fs_type, mount_point = None, ""
+            with open("/proc/mounts") as mounts:
+                for line in mounts:
+                    fields = line.split()
+                    point = fields[1].replace("\\040", " ")
+                    if len(point) > len(mount_point) and path.join(folder, "").startswith(path.join(point, "")):
+                        fs_type, mount_point = fields[2], point
+            return fs_type is not None and fs_type not in NETWORK_FS_TYPES
+    except (OSError, IndexError, AttributeError):
+        pass
+    return False
+
+
+def connect_bdd(bdd_path: str, check_same_thread: bool = True, set_journal_mode: bool = True) -> sqlite3.Connection:
+    """
+    Opens a connection to the database with a busy timeout
+
+    :param set_journal_mode: chooses the journal mode of the database file : WAL on a local disk, rollback journal
+    otherwise. Must be done by the application's main connection only, the other connections use the file's mode.
+    """
+    bdd = sqlite3.connect(bdd_path, timeout=BUSY_TIMEOUT, check_same_thread=check_same_thread)
+    if set_journal_mode:
+        use_wal = environ.get(NO_WAL_ENV, "") in ("", "0") and is_local_path(bdd_path)
+        try:
+            bdd.execute(f"PRAGMA journal_mode={'WAL' if use_wal else 'DELETE'}")
+        except sqlite3.OperationalError:  # Leaving WAL needs an exclusive access to the database
+            logging.getLogger("BDD").warning(f"Journal mode of {bdd_path} unchanged, the database is in use")
+    if bdd.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+        bdd.execute("PRAGMA synchronous=NORMAL")  # Safe in WAL mode, and much faster commits
+    return bdd
+
+
+class ConnectionPool:
+
+    def __init__(self, bdd_path: str):
+        """
+        Pool of connections to the database, for the threads (and the greenlets of a thread) of the web server.
+        Connections are reused by the thread which opened them.
+
+        :param bdd_path: database path
+        """
+        self.bdd_path = bdd_path
+        self.__idle = dict()  # Idle connections by thread {thread_id: [connection, ...], ...}
+        self.__connections = set()  # All the open connections of the pool, idle or in use
+        self.__closed = False
+        self.__lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager giving a connection of the pool to the current thread for the duration of the block
+        """
+        thread_id = threading.get_ident()
+        with self.__lock:
+            idle = self.__idle.setdefault(thread_id, [])
+            bdd = idle.pop() if idle else None
+        if bdd is None:
+            # Not bound to the thread : close() may be called by another thread
+            bdd = connect_bdd(self.bdd_path, check_same_thread=False, set_journal_mode=False)
+            with self.__lock:
+                self.__connections.add(bdd)
+
+        try:
+            yield bdd
+        finally:
+            bdd.rollback()  # Ends the read transaction, so that the connection does not hold an old snapshot
+            with self.__lock:
+                idle = self.__idle.setdefault(thread_id, [])
+                if not self.__closed and len(idle) < MAX_IDLE_CONNECTIONS:
+                    idle.append(bdd)
+                    bdd = None
+                else:
+                    self.__connections.discard(bdd)
+            if bdd is not None:
+                bdd.close()
+
+    def close(self) -> None:
+        """
+        Closes all the connections of the pool : the idle ones now, the ones in use when they are released
+        """
+        with self.__lock:
+            self.__closed = True
+            idle = [bdd for connections in self.__idle.values() for bdd in connections]
+            self.__idle.clear()
+            self.__connections.difference_update(idle)
+        for bdd in idle:
+            bdd.close()
@@ -3,9 +3,32 @@
 # Licence GPL-v3 - see LICENCE.txt
 #
 # Import CSV module
+#
+# The files are read lazily, row by row, with the csv module : quoted fields may contain the separator.
+# The encoding (UTF-8 with or without BOM, or cp1252 for the Pronote exports) and the dialect are sniffed from the
+# beginning of the file. A file guessed as UTF-8 which is not (its beginning is plain ASCII) is read again in cp1252
+# from the row where decoding failed.
 
-def process_line(ln, csv_sep):
-    name = ln.split(csv_sep)[0]
+import codecs
+import csv
+from os import path
+
+SNIFF_SIZE = 64 * 1024  # Bytes read at the beginning of the file to guess its encoding and dialect
+FALLBACK_ENCODING = "cp1252"  # Excel and Pronote exports on Windows
+PROGRESS_ROWS = 100  # Rows read between two calls of the progress callback
+
+
+class ColumnNotFoundError(Exception):
+    """The column of the groups is not in the csv file"""
+
+
+def split_name(name):
+    """
+    Splits a "LASTNAME Firstname" cell. The last word is the first name.
+
+    :return: [lastname, firstname], or "" for an empty name
+    """
+    name = name.strip()
     if name == "":
         return name
     if name[0] == name[-1] and name[0] in ['"', "'"]:
@@ -17,16 +40,124 @@ def process_line(ln, csv_sep):
         return [' '.join(nom_prenom[:-1]), nom_prenom[-1]]
 
 
-def import_csv(file_name, csv_sep):
-    file = open(file_name, "r")
-    lines = file.readlines()
-    lines.pop(0)
-    result = []
-    for ln in lines:
-        nom_prenom = process_line(ln, csv_sep)
+def process_line(ln, csv_sep):
+    return split_name(ln.split(csv_sep)[0])
+
+
+def sniff_encoding(sample):
+    """
+    Guesses the encoding of a file from its first bytes
+
+    :param sample: beginning of the file
+    :type sample: bytes
+    """
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        # The sample may end in the middle of a character : the decoder is not finalized
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+
+
+def sniff_dialect(sample, csv_sep):
+    """
+    Guesses the dialect of a file from its first lines. A file with a single column (no separator) or a dialect that
+    can't be guessed is read with csv_sep.
+
+    :param sample: beginning of the file
+    :type sample: str
+    """
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=f"{csv_sep};,\t")
+    except csv.Error:
+        class Dialect(csv.excel):
+            delimiter = csv_sep
+        return Dialect
+
+
+def read_rows(file_name, csv_sep, progress=None):
+    """
+    Generator of the rows of a csv file, header included
+
+    :param file_name: file path
+    :param csv_sep: separator used when it can't be guessed
+    :param progress: callable receiving (bytes read, file size) while reading
+    :return: rows, as lists of fields
+    :raises UnicodeDecodeError: if the file can't be decoded in UTF-8 nor in cp1252
+    """
+    size = path.getsize(file_name)
+    with open(file_name, "rb") as file:
+        sample = file.read(SNIFF_SIZE)
+    encoding = sniff_encoding(sample)
+    dialect = sniff_dialect(sample.decode(encoding, errors="ignore"), csv_sep)
+
+    nb_rows = 0
+    try:
+        with open(file_name, "r", encoding=encoding, newline="") as file:
+            for row in csv.reader(file, dialect):
+                nb_rows += 1
+                yield row
+                if progress is not None and nb_rows % PROGRESS_ROWS == 0:
+                    progress(file.buffer.tell(), size)
+    except UnicodeDecodeError:
+        if encoding == FALLBACK_ENCODING:
+            raise
+        # Not UTF-8 after the sniffed sample : the rows already read are skipped
+        with open(file_name, "r", encoding=FALLBACK_ENCODING, newline="") as file:
+            for i, row in enumerate(csv.reader(file, dialect), 1):
+                if i > nb_rows:
+                    yield row
+                if progress is not None and i % PROGRESS_ROWS == 0:
+                    progress(file.buffer.tell(), size)
+    if progress is not None:
+        progress(size, size)
+
+
+def iter_names(file_name, csv_sep, progress=None):
+    """
+    Generator of the students names of a csv file : the name is in the first column, the first row is a header
+
+    :return: [lastname, firstname] lists
+    """
+    rows = read_rows(file_name, csv_sep, progress)
+    next(rows, None)
+    for row in rows:
+        nom_prenom = split_name(row[0]) if row else ""
         if nom_prenom != "":
-            result.append(nom_prenom)
-    return result
+            yield nom_prenom
+
+
+def iter_names_by_group(file_name, csv_sep, group_column, progress=None):
+    """
+    Generator of the students names of a school-wide csv file, with their group : the name is in the first column,
+    the group in group_column. Rows without a group are ignored.
+
+    :param group_column: header of the column of the groups (case insensitive), or its number starting from 1
+    :return: (group name, [lastname, firstname]) tuples
+    :raises ColumnNotFoundError: if the file has no such column
+    """
+    rows = read_rows(file_name, csv_sep, progress)
+    header = [h.strip().lower() for h in next(rows, [])]
+    group_column = group_column.strip()
+    if group_column.lower() in header:
+        index = header.index(group_column.lower())
+    elif group_column.isdigit() and 1 <= int(group_column) <= len(header):
+        index = int(group_column) - 1
+    else:
+        raise ColumnNotFoundError(f"Column {group_column} not found in {file_name}")
+
+    for row in rows:
+        if len(row) > index:
+            nom_prenom = split_name(row[0])
+            group_name = row[index].strip()
+            if nom_prenom != "" and group_name != "":
+                yield group_name, nom_prenom
+
+
+def import_csv(file_name, csv_sep, progress=None):
+    return list(iter_names(file_name, csv_sep, progress))
 
 
 if __name__ == "__main__":
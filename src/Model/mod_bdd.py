@@ -2,7 +2,19 @@
 # file author : Olivier Lecluse
 # Licence GPL-v3 - see LICENCE.txt
 
-from src.Model.mod_types import Desk, Student
+from contextlib import contextmanager
+
+from src.Model.mod_types import Desk, Student, row_factory
+from src.Model.order_keys import ORDER_GAP, plan_reorder, spread_keys
+from src.Model.query_stats import QueryStats
+
+MAX_SQL_PARAMS = 500  # Max number of ids bound in a single request (SQLite limit is 999 on old versions)
+
+# Columns of the Desk and Student records, read by the cursors with a row factory
+DESK_REQ = """SELECT IdDesk, DeskRow, DeskCol, Desks.IdCourse, IFNULL(Students.IdStudent, 0),
+                     IFNULL(StdFirstname, ''), IFNULL(StdLastname, '')
+              FROM Desks LEFT JOIN Students USING (IdStudent)"""
+STUDENT_COLUMNS = "Students.IdStudent, StdFirstname, StdLastname, OrderKey"
 
 
 class ModBdd:
@@ -11,7 +23,82 @@ class ModBdd:
 
     def __init__(self, bdd):
         self.__bdd = bdd
-        self.__cursor = self.__bdd.cursor()
+        self.__cursor = QueryStats.getInstance().cursor(self.__bdd)
+        self.__desks_cursor = QueryStats.getInstance().cursor(self.__bdd, row_factory(Desk))
+        self.__students_cursor = QueryStats.getInstance().cursor(self.__bdd, row_factory(Student))
+        self.__cursor.execute("PRAGMA foreign_keys=ON")  # Deletions cascade to the dependent rows (schema version 4)
+        self.__transaction_depth = 0  # Nesting level of the running transaction() blocks
+        self.commit_count = 0  # Number of commits which wrote changes
+
+        # Identity map : objects already read, by id. The write requests invalidate the entries they change.
+        self.__students = dict()  # {id_std: Student, ...}
+        self.__desks = dict()  # {id_desk: Desk, ...}
+
+    #
+    # Transactions
+    #
+
+    def commit(self):
+        """Commits the pending changes
+        Inside a transaction() block, nothing is done : the changes are committed at the end of the block"""
+
+        if self.__transaction_depth == 0 and self.__bdd.in_transaction:
+            self.__cursor.execute("COMMIT")  # Through the cursor, so that the commits are timed by QueryStats
+            self.commit_count += 1
+
+    @contextmanager
+    def transaction(self):
+        """Runs the enclosed requests as one atomic unit, committed once at the end of the block.
+        If an exception is raised, all the changes of the block are rolled back.
+        Nested blocks are savepoints : they are rolled back alone on error, and committed with the outer block."""
+
+        if self.__transaction_depth == 0:
+            self.commit()
+            changes = self.__bdd.total_changes
+            self.__cursor.execute("BEGIN")
+            self.__transaction_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self.__transaction_depth -= 1
+                if self.__bdd.in_transaction:
+                    self.__cursor.execute("ROLLBACK")
+                self.clear_cache()
+                raise
+            self.__transaction_depth -= 1
+            if self.__bdd.in_transaction:
+                self.__cursor.execute("COMMIT")
+            if self.__bdd.total_changes != changes:
+                self.commit_count += 1
+        else:
+            savepoint = f"sdc_savepoint_{self.__transaction_depth}"
+            self.__cursor.execute(f"SAVEPOINT {savepoint}")
+            self.__transaction_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self.__transaction_depth -= 1
+                self.__cursor.execute(f"ROLLBACK TO {savepoint}")
+                self.__cursor.execute(f"RELEASE {savepoint}")
+                self.clear_cache()
+                raise
+            self.__transaction_depth -= 1
+            self.__cursor.execute(f"RELEASE {savepoint}")
+
+    #
+    # Identity map
+    #
+
+    def clear_cache(self):
+        """Forgets all the Student and Desk objects read so far
+        Must be called if the database is modified outside of ModBdd"""
+
+        self.__students.clear()
+        self.__desks.clear()
+
+    #
+    # Params related requests
+    #
 
     def get_version(self):
         """returns the BDD version
@@ -74,12 +161,21 @@ class ModBdd:
         output: an array of desks"""
         all_desks = []
         if id_course != 0:
-            req = "SELECT * FROM Desks WHERE IdCourse = ?;"
-            self.__cursor.execute(req, [id_course])
-            r = self.__cursor.fetchall()
-            for d in r:
-                dsk = Desk(d[0], d[1], d[2], d[3], d[4])
-                all_desks.append(dsk)
+            req = DESK_REQ + " WHERE Desks.IdCourse = ?"
+            self.__desks_cursor.execute(req, [id_course])
+            all_desks = self.__desks_cursor.fetchall()
+            self.__desks.update((d.id, d) for d in all_desks)
+        return all_desks
+
+    def get_course_snapshot(self, id_course):
+        """Fetches all the desks of the course with their students in a single request
+        input : id_course - id of the course
+        output: a list of desks ordered by the students order key (empty desks first)"""
+
+        req = DESK_REQ + " WHERE Desks.IdCourse = ? ORDER BY Students.OrderKey"
+        self.__desks_cursor.execute(req, [id_course])
+        all_desks = self.__desks_cursor.fetchall()
+        self.__desks.update((d.id, d) for d in all_desks)
         return all_desks
 
     def get_desk_id_in_course_by_coords(self, id_course, row, col):
@@ -109,31 +205,38 @@ class ModBdd:
         Input : id_desk - if of the desk
         Output : Desk object or None"""
 
-        req = "SELECT * FROM Desks WHERE IdDesk = ?"
-        self.__cursor.execute(req, [id_desk])
-        r = self.__cursor.fetchone()
-        return r if r is None else Desk(r[0], r[1], r[2], r[3], r[4])
+        if id_desk in self.__desks:
+            return self.__desks[id_desk]
+        req = DESK_REQ + " WHERE IdDesk = ?"
+        self.__desks_cursor.execute(req, [id_desk])
+        dsk = self.__desks_cursor.fetchone()
+        if dsk is not None:
+            self.__desks[id_desk] = dsk
+        return dsk
 
-    def create_course_with_name(self, name):
+    def create_course_with_name(self, name, id_topic=None):
         """Creates a new room.
         Input : name - course name
-        Output : idCourse
-        The topic id of the new course is 1 (main topic)"""
-        req = "INSERT INTO Courses (CourseName, IdTopic) VALUES (?, 1)"
-        self.__cursor.execute(req, [name])
+                id_topic - topic of the course, the first topic if None
+        Output : idCourse"""
+        if id_topic is None:
+            self.__cursor.execute("SELECT MIN(IdTopic) FROM Topics")
+            id_topic = self.__cursor.fetchone()[0]
+            if id_topic is None:
+                raise ValueError('new course error : no topic in the database')
+        req = "INSERT INTO Courses (CourseName, IdTopic) VALUES (?, ?)"
+        self.__cursor.execute(req, [name, id_topic])
         idc = self.__cursor.lastrowid
         return idc
 
     def delete_course_with_id(self, course_id):
         """delete a course given its id
-        all desks in this course will be deleted too !
+        all desks in this course will be deleted too (cascade) !
         commit must be called separately"""
-        
-        req = "DELETE FROM Desks WHERE IdCourse = ?"
-        self.__cursor.execute(req, [course_id])
 
         req = "DELETE FROM Courses WHERE IdCourse = ?"
         self.__cursor.execute(req, [course_id])
+        self.__desks = {k: d for k, d in self.__desks.items() if d.id_course != course_id}
         
     def create_new_desk_in_course(self, row, col, id_course):
         """Creates a new desk in a course
@@ -156,6 +259,7 @@ class ModBdd:
 
         req = "DELETE FROM Desks WHERE IdDesk = ?"
         self.__cursor.execute(req, [id_desk])
+        self.__desks.pop(id_desk, None)
         return None
 
     def move_desk_by_id(self, id_desk, row, col):
@@ -165,6 +269,7 @@ class ModBdd:
         Output : None"""
         req = "UPDATE Desks SET DeskRow = ?, DeskCol = ?  WHERE IdDesk = ?"
         self.__cursor.execute(req, [row, col, id_desk])
+        self.__desks.pop(id_desk, None)
         return None
 
     def set_student_in_desk_by_id(self, std_id, id_desk):
@@ -176,6 +281,7 @@ class ModBdd:
         if id_desk != 0:
             req = "UPDATE Desks SET IdStudent = ? WHERE IdDesk = ?"
             self.__cursor.execute(req, [std_id, id_desk])
+            self.__desks.pop(id_desk, None)
 
     #
     # Student relative requests
@@ -231,9 +337,62 @@ class ModBdd:
         self.__cursor.execute(req, [std_id, group_id])
         return std_id
 
+    def get_duplicate_students_in_group(self, names, group_id):
+        """Finds the names of students already in a group
+        Input : names - list of (lastname, firstname)
+                group_id - id of the group
+        Output : set of the (lastname, firstname) of names matching a student of the group"""
+
+        req = "SELECT StdLastname, StdFirstname FROM Students JOIN IsIn USING (IdStudent) WHERE IdGroup = ?"
+        self.__cursor.execute(req, [group_id])
+        existing = set(self.__cursor.fetchall())
+        return {tuple(n) for n in names if tuple(n) in existing}
+
+    def insert_students_in_group_id(self, names, group_id, skip_duplicates=False):
+        """Creates new students at the end of a group, all at once in a single transaction
+        Input : names - list of (lastname, firstname)
+                group_id - id of the group
+                skip_duplicates - if True, the names matching a student already in the group are not inserted
+        Output : list of the new students ids, in the order of names"""
+
+        names = [tuple(n) for n in names]
+        with self.transaction():
+            if skip_duplicates:
+                duplicates = self.get_duplicate_students_in_group(names, group_id)
+                names = [n for n in names if n not in duplicates]
+            self.__cursor.execute("SELECT IFNULL(MAX(IdStudent), 0) FROM Students")
+            first_id = self.__cursor.fetchone()[0] + 1
+            ids_std = list(range(first_id, first_id + len(names)))
+            orders = spread_keys(len(names), self.get_next_order_in_group(group_id))
+
+            req = "INSERT INTO Students (IdStudent, StdFirstName, StdLastName, OrderKey) VALUES (?, ?, ?, ?)"
+            self.__cursor.executemany(req, [(i, n[1], n[0], o) for i, n, o in zip(ids_std, names, orders)])
+            req = "INSERT INTO IsIn (IdStudent, IdGroup) VALUES (?, ?)"
+            self.__cursor.executemany(req, [(i, group_id) for i in ids_std])
+        return ids_std
+
+    def insert_students_by_group(self, rows, skip_duplicates=False):
+        """Creates the students of several groups at once, in a single transaction. Missing groups are created.
+        Input : rows - iterable of (group_name, (lastname, firstname))
+                skip_duplicates - if True, the names matching a student already in its group are not inserted
+        Output : dict {group_name: number of new students, ...}, in the order of first appearance of the groups"""
+
+        names_by_group = dict()
+        for group_name, name in rows:
+            names_by_group.setdefault(group_name, []).append(name)
+
+        counts = dict()
+        with self.transaction():
+            for group_name, names in names_by_group.items():
+                group_id = self.create_group(group_name)
+                counts[group_name] = len(self.insert_students_in_group_id(names, group_id, skip_duplicates))
+        return counts
+
     def rename_student_by_id(self, std_id, firstname, lastname):
         req = "UPDATE  Students SET StdFirstName = ?, StdLastName = ? WHERE IdStudent = ?"
         self.__cursor.execute(req, [firstname, lastname, std_id])
+        self.__students.pop(std_id, None)
+        self.__desks = {k: d for k, d in self.__desks.items() if d.id_student != std_id}
 
     def insert_isin(self, std_id, group_id):
         """Insert the student id in the group id"""
@@ -253,94 +412,148 @@ class ModBdd:
         return r[0]
 
     def delete_student_by_id(self, std_id):
-        """Remove a student from the surface of the earth"""
-        # Delete Attributes
-        req = "DELETE FROM StdAttrs WHERE IdStudent = ?"
-        self.__cursor.execute(req, [std_id])
-        # Free Desks
-        req = "UPDATE Desks SET IdStudent = 0 WHERE IdStudent = ?"
-        self.__cursor.execute(req, [std_id])
-        # Delete IsIn just to be sure
-        req = "DELETE FROM IsIn WHERE IdStudent = ?"
-        self.__cursor.execute(req, [std_id])
-        # Kill the student
+        """Remove a student from the surface of the earth
+        Attributes and groups memberships are deleted by cascade, desks are freed by the free_desks trigger"""
         req = "DELETE FROM Students WHERE IdStudent = ?"
         self.__cursor.execute(req, [std_id])
+        self.__students.pop(std_id, None)
+        self.__desks = {k: d for k, d in self.__desks.items() if d.id_student != std_id}
 
     def remove_student_from_group(self, std_id, group_id):
         """Remove a student from a group"""
-        self.delete_isin(std_id, group_id)
-        n = self.nb_groups_contains_student_by_id(std_id)
-        # Students belongs to no group
-        # He is fired !
-        if n == 0:
-            self.delete_student_by_id(std_id)
+        self.remove_students_from_group([std_id], group_id)
+
+    def remove_students_from_group(self, ids_std, group_id):
+        """Remove students from a group
+        Students belonging to no group anymore are deleted
+        Input : ids_std - list of students ids
+                group_id - id of the group
+        commit must be done separately"""
+
+        ids_std = list(ids_std)
+        for i in range(0, len(ids_std), MAX_SQL_PARAMS):
+            chunk = ids_std[i:i + MAX_SQL_PARAMS]
+            params = ','.join('?' * len(chunk))
+            req = f"DELETE FROM IsIn WHERE IdGroup = ? AND IdStudent IN ({params})"
+            self.__cursor.execute(req, [group_id] + chunk)
+            # They are fired !
+            req = f"DELETE FROM Students WHERE IdStudent IN ({params}) AND IdStudent NOT IN (SELECT IdStudent FROM IsIn)"
+            self.__cursor.execute(req, chunk)
+        self.clear_cache()
 
     def get_student_by_id(self, std_id):
         """Returns a Student object
         Input : idStd - student id
         Output : Student object or None of no students matches the idStd"""
 
-        req = "SELECT * FROM Students WHERE IdStudent = ?"
-        self.__cursor.execute(req, [std_id])
-        r = self.__cursor.fetchone()
-        return r if r is None else Student(std_id, r[1], r[2])
+        if std_id in self.__students:
+            return self.__students[std_id]
+        req = f"SELECT {STUDENT_COLUMNS} FROM Students WHERE IdStudent = ?"
+        self.__students_cursor.execute(req, [std_id])
+        std = self.__students_cursor.fetchone()
+        if std is not None:
+            self.__students[std_id] = std
+        return std
 
     def get_student_order_by_id(self, std_id):
-        """Returns a Student object
+        """Returns the order key of a student
         Input : idStd - student id
-        Output : Student object or None of no students matches the idStd"""
+        Output : order key or 0 of no students matches the idStd"""
 
-        req = "SELECT OrderKey FROM Students WHERE IdStudent = ?"
-        self.__cursor.execute(req, [std_id])
-        r = self.__cursor.fetchone()
-        return 0 if r is None else r[0]
+        std = self.get_student_by_id(std_id)
+        return 0 if std is None else std.order
 
     def get_students_in_course_by_id(self, id_course):
         """Returns an array of Students in the room
         Input : id_course - the course id
         Output : a list (maybe empty) of students in the course"""
-        req = """SELECT * from Students JOIN Desks USING (idStudent) WHERE Desks.IdCourse = ? ORDER BY OrderKey"""
-        self.__cursor.execute(req, [id_course])
-        r = self.__cursor.fetchall()
-        return [] if r is None else [Student(t[0], t[1], t[2]) for t in r]
+        req = f"""SELECT {STUDENT_COLUMNS} from Students JOIN Desks USING (idStudent) WHERE Desks.IdCourse = ? ORDER BY OrderKey"""
+        self.__students_cursor.execute(req, [id_course])
+        students = self.__students_cursor.fetchall()
+        self.__students.update((std.id, std) for std in students)
+        return students
 
     def get_students_in_group(self, group_name):
         """Returns an array of Students in a group
         Input : group_name - the group name
         Output : a list (maybe empty) of students in the group"""
-        req = """SELECT * from Students JOIN IsIn USING (idStudent) JOIN Groups USING (IdGroup) WHERE Groups.GroupName = ? ORDER BY OrderKey"""
-        self.__cursor.execute(req, [group_name])
-        r = self.__cursor.fetchall()
-        return [] if r is None else [Student(t[0], t[1], t[2]) for t in r]
+        req = f"""SELECT {STUDENT_COLUMNS} from Students JOIN IsIn USING (idStudent) JOIN Groups USING (IdGroup) WHERE Groups.GroupName = ? ORDER BY OrderKey"""
+        self.__students_cursor.execute(req, [group_name])
+        students = self.__students_cursor.fetchall()
+        self.__students.update((std.id, std) for std in students)
+        return students
 
     def get_student_by_desk_id(self, id_desk):
         """Returns the Id of the desk at the given coordinates
         Input : id_desk - id of the desk
         Output : student object or None"""
 
-        req = "SELECT * FROM Students JOIN Desks USING (IdStudent) WHERE Desks.IdDesk = ?"
-        self.__cursor.execute(req, [id_desk])
-        r = self.__cursor.fetchone()
-        return r if r is None else Student(r[0], r[1], r[2])
+        dsk = self.get_desk_by_id(id_desk)
+        return None if dsk is None or dsk.id_student == 0 else self.get_student_by_id(dsk.id_student)
     
     def update_student_order_with_id(self, ids, order):
         req = "UPDATE Students SET OrderKey = ? WHERE IdStudent = ?"
         self.__cursor.execute(req, [order, ids])
+        self.__students.pop(ids, None)
+
+    def get_students_order(self, ids_std):
+        """Returns the order keys of several students. The students already read are not requested again
+        Input : ids_std - list of students ids
+        Output : dict {id_std: order_key, ...}"""
+
+        orders = {id_std: self.__students[id_std].order for id_std in ids_std if id_std in self.__students}
+        missing = [id_std for id_std in ids_std if id_std not in self.__students]
+        for i in range(0, len(missing), MAX_SQL_PARAMS):
+            chunk = missing[i:i + MAX_SQL_PARAMS]
+            req = f"SELECT IdStudent, OrderKey FROM Students WHERE IdStudent IN ({','.join('?' * len(chunk))})"
+            self.__cursor.execute(req, chunk)
+            orders.update(self.__cursor.fetchall())
+        return orders
+
+    def get_next_order_in_group(self, group_id):
+        """Returns an order key placing a new student at the end of the group"""
+        req = "SELECT MAX(OrderKey) FROM Students JOIN IsIn USING (IdStudent) WHERE IdGroup = ?"
+        self.__cursor.execute(req, [group_id])
+        r = self.__cursor.fetchone()
+        return ORDER_GAP if r[0] is None else r[0] + ORDER_GAP
+
+    def reorder_students(self, ids_std):
+        """Orders the students as listed, rewriting as few order keys as possible
+        Input : ids_std - list of students ids in the wanted order
+        Output : number of updated students
+        commit must be done separately"""
+
+        current = self.get_students_order(ids_std)
+        old_keys = [current.get(id_std) for id_std in ids_std]
+        new_keys = plan_reorder(old_keys)
+        orders = {id_std: new for id_std, old, new in zip(ids_std, old_keys, new_keys) if old != new}
+        self.update_students_order(orders)
+        return len(orders)
+
+    def update_students_order(self, orders):
+        """Updates the order keys of several students at once
+        Input : orders - dict {id_std: order_key, ...}
+        commit must be done separately"""
+
+        req = "UPDATE Students SET OrderKey = ? WHERE IdStudent = ?"
+        self.__cursor.executemany(req, [(order, id_std) for id_std, order in orders.items()])
+        for id_std in orders:
+            self.__students.pop(id_std, None)
     
     def delete_group_by_id(self, group_id):
         """Delete a all students in a group then the group itself
         Commit must be done separately
         Input : group_id : Id of the group to delete
         """
-        students = self.get_students_in_group(self.get_group_name_by_id(group_id))
         # Delete all students in the group
         # If a student belongs to another group he will survive
-        for std in students:
-            self.remove_student_from_group(std.id, group_id)
-        # removes the group
+        req = """DELETE FROM Students WHERE IdStudent IN (SELECT IdStudent FROM IsIn WHERE IdGroup = ?)
+                 AND IdStudent NOT IN (SELECT IdStudent FROM IsIn WHERE IdGroup <> ?)"""
+        self.__cursor.execute(req, [group_id, group_id])
+        # removes the group, its memberships are deleted by cascade
         req = "DELETE FROM Groups WHERE IdGroup = ?"
         self.__cursor.execute(req, [group_id])
+        self.clear_cache()
     #
     # Topic relative requests
     #
@@ -372,7 +585,6 @@ class ModBdd:
             req = "INSERT INTO Topics (TopicName) VALUES (?)"
             self.__cursor.execute(req, [new_topic])
             topic_id = self.__cursor.lastrowid
-            self.__bdd.commit()
         else:
             topic_id = r[0]
         req = "UPDATE Courses SET IdTopic = ? WHERE IdCourse = ?"
@@ -403,11 +615,8 @@ class ModBdd:
     
     def delete_attribute_with_id(self, attr_id):
         """delete an attribute given its id
-        all students attributes will be deleted too !
+        all students attributes will be deleted too (cascade) !
         commit must be called separately"""
-        
-        req = "DELETE FROM StdAttrs WHERE IdAttr = ?"
-        self.__cursor.execute(req, [attr_id])
 
         req = "DELETE FROM Attributes WHERE IdAttr = ?"
         self.__cursor.execute(req, [attr_id])
@@ -418,6 +627,29 @@ class ModBdd:
         r = self.__cursor.fetchone()
         return "" if r is None else r[0]
 
+    def get_attributes_values(self, ids_std, ids_attr, id_topic):
+        """Returns the values of several attributes for several students in one topic
+        Input : ids_std - list of students ids
+                ids_attr - list of attributes ids
+                id_topic - topic id
+        Output : dict {(id_attr, id_std): value, ...} without the missing values"""
+
+        values = dict()
+        ids_std = list(ids_std)
+        ids_attr = list(ids_attr)
+        if not ids_attr:
+            return values
+        # Students are processed by chunks to stay under the SQLite host parameters limit
+        for i in range(0, len(ids_std), MAX_SQL_PARAMS):
+            chunk = ids_std[i:i + MAX_SQL_PARAMS]
+            req = f"""SELECT IdAttr, IdStudent, StdAttrValue FROM StdAttrs
+                      WHERE IdTopic = ? AND IdStudent IN ({",".join("?" * len(chunk))})
+                      AND IdAttr IN ({",".join("?" * len(ids_attr))})"""
+            self.__cursor.execute(req, [id_topic] + chunk + ids_attr)
+            for id_attr, id_std, val in self.__cursor.fetchall():
+                values[(id_attr, id_std)] = val
+        return values
+
     def get_attribute_type_from_id(self, id_attr):
         req = "SELECT AttrType FROM Attributes WHERE IdAttr = ?"
         self.__cursor.execute(req, [id_attr])
@@ -428,13 +660,34 @@ class ModBdd:
         """Insert or update Value as an attribute value
         commit must be done separately
         """
-        req = "SELECT IdStdAttr FROM StdAttrs WHERE IdStudent = ? AND IdAttr = ? AND IdTopic = ?"
-        self.__cursor.execute(req, [id_std, id_attr, id_topic])
-        r = self.__cursor.fetchone()
-        if r is None:
-            # Insert new value in the BDD
-            req = "INSERT INTO StdAttrs (StdAttrValue, IdStudent, IdAttr, IdTopic) VALUES (?, ?, ?, ?)"
-            self.__cursor.execute(req, [val, id_std, id_attr, id_topic])
-        else:
-            req = "UPDATE StdAttrs SET StdAttrValue = ? WHERE IdStdAttr = ?"
-            self.__cursor.execute(req, [val, r[0]])
+        self.set_attributes_values([id_std], id_attr, id_topic, val)
+
+    def set_attributes_values(self, ids_std, id_attr, id_topic, val):
+        """Insert or update the same attribute value for several students
+        Input : ids_std - list of students ids
+                id_attr, id_topic - attribute and topic ids
+                val - new value
+        commit must be done separately"""
+
+        req = """INSERT INTO StdAttrs (StdAttrValue, IdStudent, IdAttr, IdTopic) VALUES (?, ?, ?, ?)
+                 ON CONFLICT (IdStudent, IdAttr, IdTopic) DO UPDATE SET StdAttrValue = excluded.StdAttrValue"""
+        self.__cursor.executemany(req, [(val, id_std, id_attr, id_topic) for id_std in ids_std])
+
+    def increment_counter_attributes(self, ids_std, id_attr, id_topic, increment):
+        """Adds increment to a counter attribute of several students (a missing counter is 0)
+        commit must be done separately"""
+
+        req = """INSERT INTO StdAttrs (StdAttrValue, IdStudent, IdAttr, IdTopic) VALUES (?, ?, ?, ?)
+                 ON CONFLICT (IdStudent, IdAttr, IdTopic) DO UPDATE
+                 SET StdAttrValue = CAST(StdAttrValue AS INTEGER) + excluded.StdAttrValue"""
+        self.__cursor.executemany(req, [(increment, id_std, id_attr, id_topic) for id_std in ids_std])
+
+    def append_mark_attributes(self, ids_std, id_attr, id_topic, mark):
+        """Appends a mark to a mark attribute of several students
+        commit must be done separately"""
+
+        req = """INSERT INTO StdAttrs (StdAttrValue, IdStudent, IdAttr, IdTopic) VALUES (?, ?, ?, ?)
+                 ON CONFLICT (IdStudent, IdAttr, IdTopic) DO UPDATE
+                 SET StdAttrValue = CASE WHEN StdAttrValue = '' THEN excluded.StdAttrValue
+                                         ELSE StdAttrValue || ' ' || excluded.StdAttrValue END"""
+        self.__cursor.executemany(req, [(mark, id_std, id_attr, id_topic) for id_std in ids_std])
@@ -0,0 +1,52 @@
+# Salle de classe by Lecluse DevCorp
+# Licence GPL-v3 - see LICENCE.txt
+#
+# Database schema migrations
+#
+# The schema version is stored in the Params table (bdd_version).
+# Migration N is the script src/SQL/migrations/migrate_N.sql : it upgrades the schema from version N-1 to N.
+# Databases are migrated when they are opened, each migration in its own transaction.
+
+import logging
+from os import path
+import sqlite3
+
+MIGRATIONS_FOLDER = "src/SQL/migrations"
+BDD_VERSION = 4  # Schema version expected by the application
+
+
+def get_bdd_version(bdd: sqlite3.Connection) -> int:
+    """
+    Reads the schema version of the database
+    """
+    r = bdd.execute("SELECT ParamValue FROM Params WHERE ParamName = 'bdd_version';").fetchone()
+    return 1 if r is None else int(r[0])
+
+
+def migrate_bdd(bdd: sqlite3.Connection) -> int:
+    """
+    Applies the missing migrations to the database
+
+    :param bdd: connection to the database
+    :return: schema version after the migrations
+    """
+    version = get_bdd_version(bdd)
+    foreign_keys = bdd.execute("PRAGMA foreign_keys").fetchone()[0]
+    bdd.execute("PRAGMA foreign_keys=OFF")  # Migrations rebuild tables : dropping them must not cascade
+    try:
+        while version < BDD_VERSION:
+            version += 1
+            with open(path.normpath(f"{MIGRATIONS_FOLDER}/migrate_{version}.sql"), encoding="utf-8") as sql_file:
+                script = sql_file.read()
+            try:
+                bdd.executescript(f"BEGIN;\n{script}\n"
+                                  f"UPDATE Params SET ParamValue = '{version}' WHERE ParamName = 'bdd_version';\n"
+                                  "COMMIT;")
+            except sqlite3.Error:
+                bdd.rollback()
+                logging.getLogger("BDD").exception(f"Migration to version {version} failed")
+                raise
+            logging.getLogger("BDD").info(f"Database migrated to version {version}")
+    finally:
+        bdd.execute(f"PRAGMA foreign_keys={foreign_keys}")
+    return version
@@ -2,23 +2,34 @@
 # file author : Olivier Lecluse
 # Licence GPL-v3 - see LICENCE.txt
 
-class Desk:
-    def __init__(self, idd, row, col, id_course, id_student):
-        self.id = idd
-        self.row, self.col = row, col
-        self.id_course = id_course
-        self.id_student = id_student
-    
+from typing import NamedTuple
+
+
+class Desk(NamedTuple):
+    """Desk of a course, with its student (id_student is 0 for an empty desk)"""
+    id: int
+    row: int
+    col: int
+    id_course: int
+    id_student: int = 0
+    firstname: str = ""
+    lastname: str = ""
+
     def __str__(self):
         status = "Free" if self.id_student == 0 else "Occupied"
         return f"Desk [{self.row} - {self.col} ] Course {self.id_course} - {status}"
 
 
-class Student:
-    def __init__(self, ids=0, firstname="", lastname=""):
-        self.id = ids
-        self.firstname = firstname
-        self.lastname = lastname
+class Student(NamedTuple):
+    id: int = 0
+    firstname: str = ""
+    lastname: str = ""
+    order: int = 0
 
     def __str__(self):
         return f"{self.lastname} {self.firstname} ({self.id})"
+
+
+def row_factory(record):
+    """sqlite3 row factory building records of the NamedTuple type record from the selected columns"""
+    return lambda cursor, row: record._make(row)
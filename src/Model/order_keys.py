@@ -0,0 +1,92 @@
+# Salle de classe by Lecluse DevCorp
+# Licence GPL-v3 - see LICENCE.txt
+#
+# Sparse order keys of the students lists
+#
+# Students.OrderKey values are spaced by ORDER_GAP so that a student can be moved or inserted between two others
+# by writing a single row. When a gap is exhausted, the keys of the reordered list are spread again (rebalance).
+# A list already in order is not written at all, and a mostly unordered one is spread again without planning.
+
+from bisect import bisect_left
+
+ORDER_GAP = 1024  # Space between the keys of consecutive students
+UNORDERED_RATIO = 4  # Above 1 pair of neighbours out of order in UNORDERED_RATIO, all the keys are spread
+
+
+def spread_keys(nb_keys: int, start: int = ORDER_GAP) -> list:
+    """
+    Evenly spaced keys
+    """
+    return [start + i * ORDER_GAP for i in range(nb_keys)]
+
+
+def _longest_increasing_run(keys: list) -> list:
+    """
+    Indexes of a longest strictly increasing subsequence of keys (patience sorting)
+    """
+    tails, tails_index = [], []  # smallest tail key of the increasing subsequences of each length, and its index
+    previous = [-1] * len(keys)
+    for i, key in enumerate(keys):
+        pos = bisect_left(tails, key)
+        if pos == len(tails):
+            tails.append(key)
+            tails_index.append(i)
+        else:
+            tails[pos] = key
+            tails_index[pos] = i
+        previous[i] = tails_index[pos - 1] if pos > 0 else -1
+
+    indexes = []
+    i = tails_index[-1] if tails_index else -1
+    while i != -1:
+        indexes.append(i)
+        i = previous[i]
+    return indexes[::-1]
+
+
+def _keys_between(low, high, nb_keys: int):
+    """
+    nb_keys increasing keys strictly between low and high (None for no limit), or None if the gap is too small
+    """
+    if low is None and high is None:
+        return spread_keys(nb_keys)
+    if low is None:
+        return [high - (nb_keys - i) * ORDER_GAP for i in range(nb_keys)]
+    if high is None:
+        return [low + (i + 1) * ORDER_GAP for i in range(nb_keys)]
+    step = (high - low) // (nb_keys + 1)
+    if step < 1:
+        return None
+    return [low + (i + 1) * step for i in range(nb_keys)]
+
+
+def plan_reorder(current_keys: list) -> list:
+    """
+    Computes the new keys giving the wanted order while changing as few keys as possible :
+    the longest already ordered subsequence is kept and the other keys are placed in the gaps.
+    If a gap is too small, or if the list is mostly unordered, all the keys are spread again.
+
+    :param current_keys: current keys (None if unknown), listed in the wanted order
+    :return: new keys, in the same order
+    """
+    keys = list(current_keys)
+    unordered = sum(1 for k1, k2 in zip(keys, keys[1:]) if k1 is None or k2 is None or k1 >= k2)
+    if unordered == 0 and None not in keys:
+        return keys  # Already in order
+    if unordered * UNORDERED_RATIO > len(keys):
+        return spread_keys(len(keys))  # Mostly unordered : nearly all the keys would change anyway
+    known = [i for i, k in enumerate(keys) if k is not None]
+    kept = {known[i] for i in _longest_increasing_run([keys[i] for i in known])}
+
+    new_keys = list(keys)
+    run_start = 0
+    for i in sorted(kept) + [len(keys)]:
+        if i > run_start:
+            low = new_keys[run_start - 1] if run_start > 0 else None
+            high = new_keys[i] if i < len(keys) else None
+            between = _keys_between(low, high, i - run_start)
+            if between is None:
+                return spread_keys(len(keys))  # Rebalance
+            new_keys[run_start:i] = between
+        run_start = i + 1
+    return new_keys
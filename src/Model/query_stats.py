@@ -0,0 +1,188 @@
+# Salle de classe by Lecluse DevCorp
+# Licence GPL-v3 - see LICENCE.txt
+#
+# SQL requests instrumentation
+# Enabled with the --profile-sql command line option or the SDC_PROFILE_SQL environment variable.
+# Records the latency of the requests by ModBdd method and by SQL statement, and logs the slow requests
+# (over SDC_SLOW_QUERY_MS milliseconds, 50 by default) in ~/sdc.log.
+
+import logging
+import sys
+import threading
+import weakref
+from os import environ
+from time import perf_counter
+
+PROFILE_SQL_ARG = "--profile-sql"
+PROFILE_SQL_ENV = "SDC_PROFILE_SQL"
+SLOW_QUERY_ENV = "SDC_SLOW_QUERY_MS"
+SLOW_QUERY_MS = 50.0
+
+
+def _percentile(durations: list, p: float) -> float:
+    durations = sorted(durations)
+    return durations[min(len(durations) - 1, int(len(durations) * p))]
+
+
+class QueryStats:
+    __instance = None
+
+    def __init__(self):
+        if QueryStats.__instance is None:
+            QueryStats.__instance = self
+        else:
+            raise Exception("Use getInstance() to access the unique QueryStats instance")
+
+        self.enabled = False
+        self.slow_query_ms = SLOW_QUERY_MS
+        self.logger = logging.getLogger("SQL")
+
+        self.__by_method = dict()  # Durations in s by ModBdd method {name: [duration, ...], ...}
+        self.__by_statement = dict()  # Durations in s by SQL statement {sql: [duration, ...], ...}
+        self.__lock = threading.Lock()  # The web server threads record their requests too
+        self.__cursors = weakref.WeakSet()  # Instrumented cursors, flushed before a report
+
+    @staticmethod
+    def getInstance():
+        """
+        :rtype: QueryStats
+        """
+        if QueryStats.__instance is None:
+            QueryStats()
+        return QueryStats.__instance
+
+    def enable(self, argv: list) -> None:
+        """
+        Enables the instrumentation if asked on the command line (the option is removed from argv) or by the environment
+        """
+        if PROFILE_SQL_ARG in argv:
+            argv.remove(PROFILE_SQL_ARG)
+            self.enabled = True
+        elif environ.get(PROFILE_SQL_ENV, "") not in ("", "0"):
+            self.enabled = True
+        self.slow_query_ms = float(environ.get(SLOW_QUERY_ENV, SLOW_QUERY_MS))
+
+    def cursor(self, bdd, factory=None):
+        """
+        Cursor on the connection, instrumented if the instrumentation is enabled
+
+        :param factory: row factory of the cursor
+        """
+        cursor = bdd.cursor()
+        if factory is not None:
+            cursor.row_factory = factory
+        if not self.enabled:
+            return cursor
+        cursor = InstrumentedCursor(cursor, self)
+        with self.__lock:
+            self.__cursors.add(cursor)
+        return cursor
+
+    def record(self, method: str, statement: str, duration: float) -> None:
+        """
+        Records the duration of a request
+        """
+        statement = " ".join(statement.split())
+        with self.__lock:
+            self.__by_method.setdefault(method, []).append(duration)
+            self.__by_statement.setdefault(statement, []).append(duration)
+        if duration * 1000 >= self.slow_query_ms:
+            self.logger.warning(f"Slow query ({duration * 1000:.1f} ms) in {method} : {statement}")
+
+    def report(self, nb_statements: int = 10) -> str:
+        """
+        Writes the summary of the recorded requests in the log
+
+        :param nb_statements: number of statements to list, by decreasing total time
+        :return: the summary
+        """
+        with self.__lock:
+            cursors = list(self.__cursors)
+        for cursor in cursors:
+            cursor.flush()
+
+        with self.__lock:
+            by_method = {k: list(v) for k, v in self.__by_method.items()}
+            by_statement = {k: list(v) for k, v in self.__by_statement.items()}
+
+        def table(title, stats):
+            lines = [f"{title:<60}{'count':>8}{'total ms':>11}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}"]
+            for name, durations in stats:
+                lines.append(f"{name[:59]:<60}{len(durations):>8}{sum(durations) * 1000:>11.1f}"
+                             f"{_percentile(durations, 0.5) * 1000:>9.2f}{_percentile(durations, 0.95) * 1000:>9.2f}"
+                             f"{max(durations) * 1000:>9.2f}")
+            return lines
+
+        def by_total(stats):
+            return sorted(stats.items(), key=lambda item: sum(item[1]), reverse=True)
+
+        lines = table("ModBdd method", by_total(by_method))
+        lines += table("SQL statement", by_total(by_statement)[:nb_statements])
+        summary = "\n".join(lines)
+        for line in lines:
+            self.logger.info(line)
+        return summary
+
+
+class InstrumentedCursor:
+
+    def __init__(self, cursor, stats: QueryStats):
+        """
+        sqlite3 cursor recording the duration of each request (execution and fetch) in stats, by calling method
+
+        :param cursor: wrapped cursor
+        :type cursor: sqlite3.Cursor
+        """
+        self.__cursor = cursor
+        self.__stats = stats
+        self.__pending = None  # [method, sql, duration] of the last query, recorded once its results are fetched
+
+    def __del__(self):
+        self.flush()
+
+    def flush(self) -> None:
+        """
+        Records the last query, even if its results were not fetched
+        """
+        pending, self.__pending = self.__pending, None
+        if pending is not None:
+            self.__stats.record(*pending)
+
+    def __run(self, func, sql, args):
+        self.flush()
+        method = sys._getframe(2).f_code.co_name  # The ModBdd method which runs the request
+        start = perf_counter()
+        try:
+            func(sql, *args)
+        finally:
+            self.__pending = [method, sql, perf_counter() - start]
+            if self.__cursor.description is None:  # No result set (DML, transaction control...) : recorded now
+                self.flush()
+        return self
+
+    def __fetch(self, func):
+        start = perf_counter()
+        result = func()
+        if self.__pending is not None:
+            self.__pending[2] += perf_counter() - start
+            self.flush()
+        return result
+
+    def execute(self, sql, *args):
+        return self.__run(self.__cursor.execute, sql, args)
+
+    def executemany(self, sql, *args):
+        return self.__run(self.__cursor.executemany, sql, args)
+
+    def fetchone(self):
+        return self.__fetch(self.__cursor.fetchone)
+
+    def fetchall(self):
+        return self.__fetch(self.__cursor.fetchall)
+
+    def close(self):
+        self.flush()
+        self.__cursor.close()
+
+    def __getattr__(self, name):
+        return getattr(self.__cursor, name)
@@ -0,0 +1,159 @@
+# Salle de classe by Lecluse DevCorp
+# Licence GPL-v3 - see LICENCE.txt
+#
+# Room occupancy grid
+#
+# The desks of a course are loaded in numpy arrays indexed by (row, col) :
+# - students : NO_DESK where there is no desk, EMPTY_DESK for a free desk, the student id otherwise
+# - desks : the desk id, 0 where there is no desk
+#
+# Clusters are groups of desks touching each other (8-connectivity), for instance the tables of the room.
+
+from typing import NamedTuple
+
+import numpy as np
+
+NO_DESK = 0
+EMPTY_DESK = -1
+
+
+class Cluster(NamedTuple):
+    """Group of adjacent cells : cells are listed row by row, the bounding box limits are included"""
+    cells: list
+    top: int
+    left: int
+    bottom: int
+    right: int
+
+
+def label_clusters(mask: np.ndarray) -> tuple:
+    """
+    Connected-component labeling (8-connectivity).
+    The horizontal runs of cells are found with numpy, then the runs touching each other on consecutive rows are merged
+    with a union-find.
+
+    :param mask: 2D boolean array of the cells to group
+    :return: (labels, nb_clusters) - labels is 0 outside of the mask, clusters are numbered from 1 in the row-major
+             order of their first cell
+    """
+    labels = np.zeros(mask.shape, dtype=np.int64)
+    edges = np.diff(np.pad(mask.astype(np.int8), ((0, 0), (1, 1))), axis=1)
+    runs_row, runs_start = np.nonzero(edges == 1)  # Runs of cells, row by row : [start, end[
+    runs_end = np.nonzero(edges == -1)[1]
+    if len(runs_row) == 0:
+        return labels, 0
+
+    parent = list(range(len(runs_row)))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    # Merges the runs with the runs of the previous row they touch (diagonals included)
+    rows_first_run = np.searchsorted(runs_row, np.arange(mask.shape[0] + 1))
+    runs_row, runs_start, runs_end = runs_row.tolist(), runs_start.tolist(), runs_end.tolist()
+    for row in range(1, mask.shape[0]):
+        prev, prev_end = rows_first_run[row - 1], rows_first_run[row]
+        for run in range(rows_first_run[row], rows_first_run[row + 1]):
+            while prev < prev_end and runs_end[prev] < runs_start[run]:
+                prev += 1
+            above = prev
+            while above < prev_end and runs_start[above] <= runs_end[run]:
+                root_a, root_b = find(run), find(above)
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+                above += 1
+
+    # Clusters are numbered by order of appearance of their first run
+    roots = [find(run) for run in range(len(parent))]
+    numbering = dict()
+    runs_label = [numbering.setdefault(root, len(numbering) + 1) for root in roots]
+    labels[mask] = np.repeat(runs_label, np.array(runs_end) - np.array(runs_start))
+    return labels, len(numbering)
+
+
+def find_clusters(mask: np.ndarray) -> list:
+    """
+    Groups the adjacent cells of the mask
+
+    :param mask: 2D boolean array of the cells to group
+    :return: list of Cluster, in the row-major order of their first cell
+    """
+    labels, nb_clusters = label_clusters(mask)
+    if nb_clusters == 0:
+        return []
+    cells_labels = labels[mask]
+    order = np.argsort(cells_labels, kind="stable")  # Row-major order is kept inside each cluster
+    coords = np.argwhere(mask)[order]
+    bounds = np.concatenate(([0], np.cumsum(np.bincount(cells_labels, minlength=nb_clusters + 1)[1:])))
+    tops, lefts = np.minimum.reduceat(coords, bounds[:-1]).T.tolist()
+    bottoms, rights = np.maximum.reduceat(coords, bounds[:-1]).T.tolist()
+    cells = list(map(tuple, coords.tolist()))
+    return [Cluster(cells[bounds[i]:bounds[i + 1]], tops[i], lefts[i], bottoms[i], rights[i])
+            for i in range(nb_clusters)]
+
+
+def clusters_layout(clusters: list) -> dict:
+    """
+    Arranges the clusters in rows and columns : clusters starting on the same row of the room make a row of clusters,
+    ordered from left to right.
+
+    :param clusters: list of Cluster, in the row-major order of their first cell (as returned by find_clusters)
+    :return: {(cluster_row, cluster_col): Cluster, ...}
+    """
+    layout = dict()
+    cluster_row, cluster_col, start_row = -1, 0, None
+    for cluster in clusters:
+        first_row = cluster.cells[0][0]
+        if first_row != start_row:
+            cluster_row, cluster_col, start_row = cluster_row + 1, 0, first_row
+        layout[(cluster_row, cluster_col)] = cluster
+        cluster_col += 1
+    return layout
+
+
+class RoomGrid:
+    def __init__(self, rows: int, cols: int):
+        self.rows, self.cols = rows, cols
+        self.students = np.full((rows, cols), NO_DESK, dtype=np.int64)
+        self.desks = np.zeros((rows, cols), dtype=np.int64)
+
+    @classmethod
+    def load(cls, mod_bdd, id_course: int, rows: int, cols: int):
+        """
+        Loads the desks of a course with a single request. Desks outside of the room size are ignored.
+
+        :param mod_bdd: model
+        :type mod_bdd: ModBdd
+        :param id_course: course id
+        :param rows: number of rows of the room
+        :param cols: number of columns of the room
+        :rtype: RoomGrid
+        """
+        grid = cls(rows, cols)
+        for d in mod_bdd.get_course_snapshot(id_course):
+            if 0 <= d.row < rows and 0 <= d.col < cols:
+                grid.desks[d.row, d.col] = d.id
+                grid.students[d.row, d.col] = d.id_student if d.id_student else EMPTY_DESK
+        return grid
+
+    def free_desks(self) -> list:
+        """
+        Free desks, row by row
+
+        :return: [(id_desk, row, col), ...]
+        """
+        return [(int(self.desks[r, c]), int(r), int(c)) for r, c in np.argwhere(self.students == EMPTY_DESK)]
+
+    def placed_students(self) -> set:
+        """
+        Ids of the students sitting at a desk
+        """
+        return set(self.students[self.students > 0].tolist())
+
+    def clusters(self) -> list:
+        """
+        Groups of adjacent desks, in the row-major order of their first desk
+        """
+        return find_clusters(self.students != NO_DESK)
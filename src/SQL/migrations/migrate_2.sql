@@ -0,0 +1,11 @@
+-- Indexes for the most frequent lookups
+
+-- Only one value per student, attribute and topic : keep the one that was read and updated so far
+DELETE FROM StdAttrs WHERE IdStdAttr NOT IN (
+    SELECT MIN(IdStdAttr) FROM StdAttrs GROUP BY IdStudent, IdAttr, IdTopic
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_StdAttrs_student_attr_topic ON StdAttrs (IdStudent, IdAttr, IdTopic);
+
+CREATE INDEX IF NOT EXISTS idx_Desks_course_coords ON Desks (IdCourse, DeskRow, DeskCol);
+CREATE INDEX IF NOT EXISTS idx_Desks_student ON Desks (IdStudent);
+CREATE INDEX IF NOT EXISTS idx_IsIn_group_student ON IsIn (IdGroup, IdStudent);
@@ -0,0 +1,3 @@
+-- Sparse students order keys (see src/Model/order_keys.py) : a student moved between two others gets a key in the gap
+-- between theirs, only its row is updated. The keys are spread again when a gap is exhausted.
+UPDATE Students SET OrderKey = OrderKey * 1024;
@@ -0,0 +1,66 @@
+-- Foreign keys with ON DELETE CASCADE : deleting a course, a group, a student or an attribute deletes its dependent
+-- rows. ModBdd enables the foreign keys on its connection (PRAGMA foreign_keys=ON).
+-- SQLite can't alter a constraint, the tables are rebuilt. The orphan rows are removed first.
+
+DELETE FROM Desks WHERE IdCourse NOT IN (SELECT IdCourse FROM Courses);
+UPDATE Desks SET IdStudent = 0 WHERE IdStudent <> 0 AND IdStudent NOT IN (SELECT IdStudent FROM Students);
+DELETE FROM IsIn WHERE IdStudent NOT IN (SELECT IdStudent FROM Students) OR IdGroup NOT IN (SELECT IdGroup FROM Groups);
+DELETE FROM StdAttrs WHERE IdStudent NOT IN (SELECT IdStudent FROM Students) OR IdAttr NOT IN (SELECT IdAttr FROM Attributes);
+UPDATE Courses SET IdTopic = (SELECT MIN(IdTopic) FROM Topics) WHERE IdTopic NOT IN (SELECT IdTopic FROM Topics);
+
+CREATE TABLE Courses_new (
+    IdCourse INTEGER PRIMARY KEY,
+    CourseName VARCHAR(30),
+    IdTopic INTEGER,
+    FOREIGN KEY (IdTopic) REFERENCES Topics(IdTopic)
+);
+INSERT INTO Courses_new SELECT IdCourse, CourseName, IdTopic FROM Courses;
+DROP TABLE Courses;
+ALTER TABLE Courses_new RENAME TO Courses;
+
+-- IdStudent is 0 for an empty desk : it is not a foreign key, the desks are freed by the trigger free_desks
+CREATE TABLE Desks_new (
+    IdDesk INTEGER PRIMARY KEY,
+    DeskRow INTEGER,
+    DeskCol INTEGER,
+    IdCourse INTEGER,
+    IdStudent INTEGER,
+    FOREIGN KEY (IdCourse) REFERENCES Courses(IdCourse) ON DELETE CASCADE
+);
+INSERT INTO Desks_new SELECT IdDesk, DeskRow, DeskCol, IdCourse, IdStudent FROM Desks;
+DROP TABLE Desks;
+ALTER TABLE Desks_new RENAME TO Desks;
+CREATE INDEX idx_Desks_course_coords ON Desks (IdCourse, DeskRow, DeskCol);
+CREATE INDEX idx_Desks_student ON Desks (IdStudent);
+
+CREATE TABLE IsIn_new (
+    IdStudent INTEGER,
+    IdGroup INTEGER,
+    FOREIGN KEY (IdStudent) REFERENCES Students(IdStudent) ON DELETE CASCADE,
+    FOREIGN KEY (IdGroup) REFERENCES Groups(IdGroup) ON DELETE CASCADE
+);
+INSERT INTO IsIn_new SELECT IdStudent, IdGroup FROM IsIn;
+DROP TABLE IsIn;
+ALTER TABLE IsIn_new RENAME TO IsIn;
+CREATE INDEX idx_IsIn_group_student ON IsIn (IdGroup, IdStudent);
+CREATE INDEX idx_IsIn_student ON IsIn (IdStudent);
+
+CREATE TABLE StdAttrs_new (
+    IdStdAttr INTEGER PRIMARY KEY,
+    StdAttrValue TEXT,
+    IdAttr INTEGER,
+    IdStudent INTEGER,
+    IdTopic INTEGER,
+    FOREIGN KEY (IdAttr) REFERENCES Attributes(IdAttr) ON DELETE CASCADE,
+    FOREIGN KEY (IdStudent) REFERENCES Students(IdStudent) ON DELETE CASCADE
+);
+INSERT INTO StdAttrs_new SELECT IdStdAttr, StdAttrValue, IdAttr, IdStudent, IdTopic FROM StdAttrs;
+DROP TABLE StdAttrs;
+ALTER TABLE StdAttrs_new RENAME TO StdAttrs;
+CREATE UNIQUE INDEX idx_StdAttrs_student_attr_topic ON StdAttrs (IdStudent, IdAttr, IdTopic);
+CREATE INDEX idx_StdAttrs_attr ON StdAttrs (IdAttr);
+
+CREATE TRIGGER free_desks AFTER DELETE ON Students
+BEGIN
+    UPDATE Desks SET IdStudent = 0 WHERE IdStudent = OLD.IdStudent;
+END;
@@ -2,7 +2,7 @@
 # file author : Thomas Lecluse
 # Licence GPL-v3 - see LICENCE.txt
 
-from PySide2.QtWidgets import QDialog, QFileDialog, QGridLayout, QComboBox, QLabel
+from PySide2.QtWidgets import QDialog, QFileDialog, QGridLayout, QComboBox, QLabel, QCheckBox, QLineEdit
 from PySide2.QtCore import Qt
 
 from src.assets_manager import tr, get_stylesheet
@@ -36,6 +36,14 @@ class DialogImportCsv(QDialog):
         self.combo_group.addItems(groups)
         self.combo_group.setFixedWidth(200)
 
+        # School-wide import : the students are dispatched in groups given by a column of the file
+        self.check_by_group = QCheckBox(tr("import_by_group"))
+        self.group_column_edit = QLineEdit(tr("import_group_column"))
+        self.group_column_edit.setFixedWidth(200)
+        self.group_column_edit.setEnabled(False)
+        self.check_by_group.toggled.connect(self.group_column_edit.setEnabled)
+        self.check_by_group.toggled.connect(lambda checked: self.combo_group.setEnabled(not checked))
+
         # Layout
         self.__set_layout()
 
@@ -49,6 +57,8 @@ class DialogImportCsv(QDialog):
         layout.addWidget(self.lab_sep, 1, 0, 1, 2)
         layout.addWidget(self.lab_group, 2, 0, alignment=Qt.AlignRight)
         layout.addWidget(self.combo_group, 2, 1, alignment=Qt.AlignLeft)
+        layout.addWidget(self.check_by_group, 3, 0, alignment=Qt.AlignRight)
+        layout.addWidget(self.group_column_edit, 3, 1, alignment=Qt.AlignLeft)
 
         self.setLayout(layout)
 
@@ -64,3 +74,9 @@ class DialogImportCsv(QDialog):
         """
         return self.fileDialog.selectedFiles()[0]
 
+    def group_column(self) -> str:
+        """
+        :return: The column of the groups for a school-wide import, or an empty string to import in the selected group
+        """
+        return self.group_column_edit.text() if self.check_by_group.isChecked() else ""
+
@@ -21,7 +21,7 @@ class VInfoDialog(QDialog):
         QDialog.__init__(self, parent)
 
         if img_path is None:
-            self.setFixedSize(QSize(350, 80))
+            self.setMinimumSize(QSize(350, 80))  # Grows with long messages (import reports)
 
         self.info = QLabel(message)
         self.info.setAlignment(Qt.AlignCenter)
@@ -6,7 +6,6 @@ from PySide2.QtWidgets import QDialog, QVBoxLayout, QLabel
 from PySide2.QtCore import Qt, QSize
 from PySide2.QtGui import QPixmap, QImage
 
-import pyqrcode
 import socket
 import tempfile
 
@@ -38,6 +37,8 @@ class VQRCode(QDialog):
             # get tmp folder
             qr_path = tempfile.mktemp()
 
+            import pyqrcode  # Only needed here, not imported at startup
+
             s = f"http://{local_ip_address}:{port}/mobile"  # String which represents the QR code
             self.url = pyqrcode.create(s)  # Generate QR code
             self.url.png(qr_path, scale=6)  # Create and save the QR png file
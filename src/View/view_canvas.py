@@ -3,8 +3,8 @@
 # Licence GPL-v3 - see LICENCE.txt
 
 from PySide2.QtWidgets import QWidget
-from PySide2.QtGui import QPainter, QColor, QPen, QPalette, QFont, QPixmap, QRegion
-from PySide2.QtCore import QPoint, QRect, Qt, Signal, Slot, QTimer, QThread, QObject
+from PySide2.QtGui import QPainter, QColor, QPen, QBrush, QPalette, QFont, QPixmap, QRegion
+from PySide2.QtCore import QPoint, QLine, QRect, Qt, Signal, Slot, QTimer, QThread, QObject
 
 from src.View.popup.view_printer import CustomPrinterDialog
 from src.assets_manager import AssetManager, get_student_img
@@ -266,6 +266,55 @@ class ViewTile(QObject):
         return self.__real_pos
 
 
+class CanvasRenderStyle:
+
+    def __init__(self):
+        """
+        Prebuilt pens, brushes and font used to paint the canvas.
+        Built from the configuration once, and rebuilt only when the colors or sizes change, so that painting does not
+        need to convert any config string.
+        """
+        self.grid_pen = QPen()
+        self.text_pen = QPen()
+        self.font = QFont()
+
+        self.tile_brush = QBrush()
+        self.selected_tile_brush = QBrush()
+        self.hovered_tile_brush = QBrush()
+        self.hovered_empty_tile_brush = QBrush()
+        self.dragged_tile_brush = QBrush()
+        self.drag_selected_tile_brush = QBrush()
+        self.mask_brush = QBrush(QColor("#55CECE"))
+
+        self.use_masks = False
+
+    def rebuild(self, is_config: bool) -> None:
+        """
+        Rebuilds all the painting objects from the current configuration
+
+        :param is_config: True if the canvas is in config mode (the grid is only visible in config mode)
+        """
+        asset_manager = AssetManager.getInstance()
+
+        self.grid_pen = QPen(asset_manager.config_color('colors', 'room_grid') if is_config else QColor("white"))
+        self.grid_pen.setWidth(2)
+
+        self.text_pen = QPen(asset_manager.config_color('colors', 'tile_text'))
+        self.text_pen.setWidth(2)
+
+        self.font = QFont()
+        self.font.setPixelSize(asset_manager.config_int('size', 'font_size'))
+
+        self.tile_brush = QBrush(asset_manager.config_color('colors', 'tile'))
+        self.selected_tile_brush = QBrush(asset_manager.config_color('colors', 'selected_tile'))
+        self.hovered_tile_brush = QBrush(asset_manager.config_color('colors', 'hovered_tile'))
+        self.hovered_empty_tile_brush = QBrush(asset_manager.config_color('colors', 'hovered_empty_tile'))
+        self.dragged_tile_brush = QBrush(asset_manager.config_color('colors', 'dragged_tile'))
+        self.drag_selected_tile_brush = QBrush(asset_manager.config_color('colors', 'drag_selected_tile'))
+
+        self.use_masks = asset_manager.config_bool("photos", "use_masks")
+
+
 class ViewCanvas(QWidget):
     sig_move_ended = Signal()
 
@@ -278,8 +327,8 @@ class ViewCanvas(QWidget):
         """
         QWidget.__init__(self)
 
-        self.desk_h_size = int(AssetManager.getInstance().config('size', 'desk_height'))
-        self.desk_w_size = int(AssetManager.getInstance().config('size', 'desk_width'))
+        self.desk_h_size = AssetManager.getInstance().config_int('size', 'desk_height')
+        self.desk_w_size = AssetManager.getInstance().config_int('size', 'desk_width')
         self.setAutoFillBackground(True)
         self.setMouseTracking(True)
 
@@ -315,9 +364,17 @@ class ViewCanvas(QWidget):
         self.__running_animations = 0
         self.update_timer = None  # Timer running only during animations to perform the UI update
 
-        self.nb_rows = int(AssetManager.getInstance().config('size', 'default_room_rows'))
-        self.nb_columns = int(AssetManager.getInstance().config('size', 'default_room_columns'))
+        self.nb_rows = AssetManager.getInstance().config_int('size', 'default_room_rows')
+        self.nb_columns = AssetManager.getInstance().config_int('size', 'default_room_columns')
         self.setFixedSize(self.desk_w_size * self.nb_columns, self.desk_h_size * self.nb_rows)
+
+        # Grid lines, they only depend on the room and desks sizes
+        self.__grid_lines = [QLine(0, r * self.desk_h_size, self.desk_w_size * self.nb_columns, r * self.desk_h_size)
+                             for r in range(self.nb_rows)]
+        self.__grid_lines += [QLine(c * self.desk_w_size, 0, c * self.desk_w_size, self.desk_h_size * self.nb_rows)
+                              for c in range(self.nb_columns)]
+
+        self.render_style = CanvasRenderStyle()  # Pens, brushes and font used by the paintEvent
         self.__init_style()
 
     def __init_style(self):
@@ -330,6 +387,8 @@ class ViewCanvas(QWidget):
         pal.setColor(QPalette.Background, QColor(color))
         self.setPalette(pal)
 
+        self.render_style.rebuild(self.__is_config)
+
     def config_mode(self, is_config: bool) -> None:
         """
         Switches the config mode flag
@@ -338,6 +397,14 @@ class ViewCanvas(QWidget):
         self.__init_style()
         self.repaint()
 
+    @Slot()
+    def on_config_changed(self) -> None:
+        """
+        Triggered when the settings have been changed. Refreshes the canvas with the new configuration
+        """
+        self.__init_style()
+        self.repaint()
+
     def remove_tile(self, desk_id):
         """
         Removes the tile at the given row/column position
@@ -453,29 +520,15 @@ class ViewCanvas(QWidget):
         Draws the desks and students' names given the self.tiles list
         """
         painter = QPainter(self)
-        color = AssetManager.getInstance().config('colors', 'room_grid') if self.__is_config else "white"
-
-        pen = QPen()
-        pen.setColor(QColor(color))
-        pen.setWidth(2)
-        painter.setPen(pen)
+        style = self.render_style
 
         # Draw the grid
-        for r in range(self.nb_rows):
-            painter.drawLine(QPoint(0, r * self.desk_h_size),
-                             QPoint(self.desk_w_size * self.nb_columns, r * self.desk_h_size))
-
-        for c in range(self.nb_columns):
-            painter.drawLine(QPoint(c * self.desk_w_size, 0),
-                             QPoint(c * self.desk_w_size, self.desk_h_size * self.nb_rows))
+        painter.setPen(style.grid_pen)
+        painter.drawLines(self.__grid_lines)
 
         # Update painter color and font size for tiles
-        pen.setColor(QColor(AssetManager.getInstance().config('colors', 'tile_text')))
-        painter.setPen(pen)
-
-        font = QFont()
-        font.setPixelSize(int(AssetManager.getInstance().config('size', 'font_size')))
-        painter.setFont(font)
+        painter.setPen(style.text_pen)
+        painter.setFont(style.font)
 
         # Current tile selected by the mouse
         tile_selected_pos = self.__convert_point(self.__mouse_pos[0], self.__mouse_pos[1]) if self.__mouse_pos else None
@@ -487,14 +540,14 @@ class ViewCanvas(QWidget):
             y, x = self.__relative_mouse_position(t.real_position())
             if self.__relative_grid_position(t.grid_position()) == self.__click_pos and self.__is_config:  # If the tile is selected
                 tile_selected = t
-                color = QColor(AssetManager.getInstance().config('colors', 'drag_selected_tile'))
+                brush = style.drag_selected_tile_brush
             elif self.__relative_grid_position(t.grid_position()) == tile_selected_pos and self.__is_config:  # If the mouse is hover
                 self.hovered = True
-                color = QColor(AssetManager.getInstance().config('colors', 'hovered_tile'))
+                brush = style.hovered_tile_brush
             elif t.is_selected():
-                color = QColor(AssetManager.getInstance().config('colors', 'selected_tile'))
+                brush = style.selected_tile_brush
             else:  # Regular tile
-                color = QColor(AssetManager.getInstance().config('colors', 'tile'))
+                brush = style.tile_brush
 
                 if self.__is_tile_correct_for_show_photo(t):
                     if t.id() not in self.students_ids:
@@ -504,7 +557,7 @@ class ViewCanvas(QWidget):
                     self.photo_desk_id = t.id()
 
             rect = self.__get_rect_at(y, x)
-            painter.fillRect(rect, color)
+            painter.fillRect(rect, brush)
             painter.drawText(rect, Qt.AlignCenter | Qt.TextWordWrap, f"{t.lastname()}\n{t.firstname()}")
 
         # Dragged tile
@@ -529,14 +582,14 @@ class ViewCanvas(QWidget):
             painter.drawImage(rect.topLeft(), img)
             self.photo_desk_id = -1  # Reset for next time
 
-            if eval(AssetManager.getInstance().config("photos", "use_masks")):
+            if style.use_masks:
                 top_left_x = rect.topLeft().x() + img.width() // 3
                 top_left_y = rect.topLeft().y() + img.height() * 5 // 9
 
                 bottom_right_x = rect.topLeft().x() + img.width() * 2 // 3
                 bottom_right_y = rect.topLeft().y() + img.height() * 7 // 9
 
-                painter.fillRect(QRect(QPoint(top_left_x, top_left_y), QPoint(bottom_right_x, bottom_right_y)), QColor("#55CECE"))
+                painter.fillRect(QRect(QPoint(top_left_x, top_left_y), QPoint(bottom_right_x, bottom_right_y)), style.mask_brush)
 
     def __is_tile_correct_for_show_photo(self, t: ViewTile) -> bool:
         """
@@ -567,11 +620,11 @@ class ViewCanvas(QWidget):
             hov_x = x // self.desk_h_size * self.desk_h_size
             hov_y = y // self.desk_w_size * self.desk_w_size
             hov_rect = self.__get_rect_at(hov_y, hov_x)
-            painter.fillRect(hov_rect, QColor(AssetManager.getInstance().config('colors', 'hovered_empty_tile')))
+            painter.fillRect(hov_rect, self.render_style.hovered_empty_tile_brush)
 
         rect = QRect(QPoint(PADDING + y - self.desk_w_size / 2, PADDING + x - self.desk_h_size / 2),
                      QPoint(y + self.desk_w_size / 2 - PADDING, x + self.desk_h_size / 2 - PADDING))
-        painter.fillRect(rect, QColor(AssetManager.getInstance().config('colors', 'dragged_tile')))
+        painter.fillRect(rect, self.render_style.dragged_tile_brush)
         painter.drawText(rect, Qt.AlignCenter | Qt.TextWordWrap, f"{tile.lastname()}\n{tile.firstname()}")
 
     def get_selected_tiles(self):
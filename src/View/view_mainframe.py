@@ -173,6 +173,7 @@ class SideDockWidget(QDockWidget):
 
 
 class ViewMainFrame(QMainWindow):
+    sig_config_changed = Signal()  # Emitted once new settings have been saved
 
     def __init__(self, sig_quit: Signal, sig_config_mode_changed: Signal, sig_export_csv: Signal):
         """
@@ -200,6 +201,7 @@ class ViewMainFrame(QMainWindow):
         self.central_widget = CentralWidget(self.status_bar.showMessage, self.__active_tab_changed)
 
         self.sidewidget.dockLocationChanged.connect(self.on_side_widget_docked_state_changed)
+        self.sig_config_changed.connect(self.central_widget.classroom_tab.v_canvas.on_config_changed)
 
         self.__config_mode = False  # Config mode flag, should be initialized to False in all widgets
         self.__init_callbacks()
@@ -317,8 +319,8 @@ class ViewMainFrame(QMainWindow):
                 AssetManager.getInstance().save_config(dlg.new_config())
 
             self.status_bar.showMessage(tr("acknowledge_changes"), 3000)
+            self.sig_config_changed.emit()
             self.repaint()
-            self.central_widget.classroom_tab.v_canvas.repaint()
 
             if dlg.need_restart():
                 restart_confirm = VConfirmDialog(self, "need_restart")
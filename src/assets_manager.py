@@ -2,14 +2,28 @@
 # file author : Thomas & Olivier Lecluse
 # Licence GPL-v3 - see LICENCE.txt
 
-from PySide2.QtGui import QIcon, QImage
+from PySide2.QtGui import QIcon, QImage, QColor
 from importlib import import_module
 from configparser import ConfigParser
-from os import path, makedirs
+from os import path, makedirs, stat, environ
+from time import monotonic, time
+from functools import lru_cache
 import shutil
-import requests
+import json
+
+from src.photo_store import PhotoStore
 
 CONFIG_PATH = 'config.ini'
+CONFIG_CHECK_DELAY = 1.0  # Minimum delay (in seconds) between two mtime checks of the config file
+
+LATEST_RELEASE_URL = 'https://api.github.com/repos/wawachief/SalleDeClasse/releases/latest'
+VERSION_CACHE_FILE = ".SdC_version"  # Stored next to the config file
+VERSION_CACHE_TTL = 24 * 3600  # In seconds
+VERSION_CHECK_TIMEOUT = 5  # In seconds
+NO_VERSION_CHECK_ENV = "SDC_NO_VERSION_CHECK"  # Set this environment variable to disable the release check
+
+PHOTO_CACHE_SIZE = 128  # Max number of scaled photos kept in memory
+PHOTO_CHECK_DELAY = 2.0  # Minimum delay (in seconds) between two checks of the photo file of a student
 
 ASSETS_PATH = "assets/"
 ICONS_PATH = "icons/"
@@ -305,6 +319,13 @@ COLOR_DICT1 = {
     "FF9505": "Yellow Orange (Color Wheel)", "FFF700": "Yellow Sunshine", "2E5090": "YInMn Blue", "0014A8": "Zaffre",
     "39A78E": "Zomp"}
 
+# Polulate W3C colors with other custom colors
+for _c in COLOR_DICT1:
+    if "#" + _c.lower() not in COLOR_DICT:
+        COLOR_DICT["#" + _c.lower()] = COLOR_DICT1[_c] + " *"
+
+_color_index = None  # Nearest color lookup arrays (hex colors list, numpy RGB array), built on first use
+
 
 def get_icon(name: str, ext: str = ICONS_EXT) -> QIcon:
     """
@@ -329,31 +350,147 @@ def get_stylesheet(file: str) -> str:
     with open(ASSETS_PATH + STYLE_PATH + file + STYLE_EXT, "r") as f:
         return f.read()
 
+_checked_photo_paths = set()  # Photo folders known to exist
+_photo_stores = {}  # Thumbnails stores {photo_path: PhotoStore, ...}
+_photo_files = {}  # Resolved photo files {(id_std, width): (img_path, mtime, check time), ...}
+
+
+def closest_color(hex_color: str) -> str:
+    """
+    Looks for the named color nearest to the given one (euclidean distance in the RGB space)
+
+    :param hex_color: color in the '#rrggbb' format
+    :return: key of COLOR_DICT of the nearest color
+    """
+    global _color_index
+
+    hex_color = hex_color.lower()
+    if hex_color in COLOR_DICT:
+        return hex_color
+
+    import numpy as np
+
+    if _color_index is None:
+        hex_colors = list(COLOR_DICT)
+        packed = np.array([int(c[1:], 16) for c in hex_colors], dtype=np.int32)
+        _color_index = hex_colors, np.stack([packed >> 16, (packed >> 8) & 0xFF, packed & 0xFF], axis=1)
+
+    hex_colors, rgb = _color_index
+    value = int(hex_color.lstrip("#"), 16)
+    distances = ((rgb - [value >> 16, (value >> 8) & 0xFF, value & 0xFF]) ** 2).sum(axis=1)
+    return hex_colors[int(distances.argmin())]
+
+
+def color_name(hex_color: str) -> str:
+    """
+    Display name of the given color, or of the nearest named color
+    """
+    return COLOR_DICT[closest_color(hex_color)]
+
+
 def get_photo_path():
     photo_path =  path.expanduser(AssetManager.getInstance().config("main", "bdd_path").replace("sdc_db", "/sdc_photos/"))
-    if not path.isdir(photo_path):
-        makedirs(photo_path)
+    if photo_path not in _checked_photo_paths:
+        if not path.isdir(photo_path):
+            makedirs(photo_path)
+        _checked_photo_paths.add(photo_path)
     return photo_path
 
-def get_student_img(id_std: int) -> QImage:
+
+def get_photo_store() -> PhotoStore:
     """
-    Gets the student image associated to the ID (tries with .png and .jpg extensions)
+    Gets the thumbnails store of the current photos folder
+    """
+    photo_path = get_photo_path()
+    if photo_path not in _photo_stores:
+        _photo_stores[photo_path] = PhotoStore(photo_path)
+    return _photo_stores[photo_path]
 
-    :param id_std: id of the student
-    :return: his/her associated photo
+
+def get_thumbnails_widths() -> list:
     """
-    img_path = get_photo_path() + str(id_std)
-    if path.exists(img_path + ".png"):
-        img_path += ".png"
-    else:
-        img_path += ".jpg"
+    Widths of the thumbnails to generate : the configured photo width (canvas hover photo and student attributes dialog)
+    """
+    return [AssetManager.getInstance().config_int("photos", "photo_width")]
+
+
+def _get_student_img_file(id_std: int, width: int) -> tuple:
+    """
+    Gets the image file to display for the student ID and its modification time : the thumbnail of the given width if
+    it exists, the original photo otherwise.
+    The result is kept in memory and checked again at most once every PHOTO_CHECK_DELAY seconds, so that a photo
+    added or replaced outside of the application is picked up.
 
+    :param id_std: id of the student
+    :param width: display width
+    :return: (image path, mtime), mtime is 0 if there is no photo
+    """
+    now = monotonic()
+    cached = _photo_files.get((id_std, width))
+    if cached is None or now - cached[2] >= PHOTO_CHECK_DELAY:
+        store = get_photo_store()
+        img_file = store.get_thumbnail(id_std, width)
+        if img_file is None:
+            source = store.source_file(id_std)
+            img_file = (path.join(store.photo_path, source[0]), source[1]) if source else ("", 0)
+        cached = (*img_file, now)
+        _photo_files[(id_std, width)] = cached
+    return cached[:2]
+
+
+@lru_cache(maxsize=PHOTO_CACHE_SIZE)
+def _load_scaled_img(img_path: str, width: int, mtime: float) -> QImage:
+    """
+    Loads the image and scales it to the given width if needed. Results are kept in a bounded LRU cache, the mtime
+    being part of the key so that a modified photo is reloaded.
+    """
+    if not mtime:
+        return QImage()  # No photo for this student
     img = QImage(img_path)
-    if not img.isNull():
-        img = img.scaledToWidth(int(AssetManager.getInstance().config("photos", "photo_width")))
+    if not img.isNull() and img.width() != width:
+        img = img.scaledToWidth(width)
     return img
 
 
+def get_student_img(id_std: int, width: int = None) -> QImage:
+    """
+    Gets the student image associated to the ID, scaled to the given width (configured photo width by default).
+    Once loaded, the image is served from memory without any disk access. The returned image must not be modified.
+
+    :param id_std: id of the student
+    :param width: image width
+    :return: his/her associated photo
+    """
+    if width is None:
+        width = AssetManager.getInstance().config_int("photos", "photo_width")
+    img_path, mtime = _get_student_img_file(id_std, width)
+    return _load_scaled_img(img_path, width, mtime)
+
+
+def update_student_thumbnails(ids_std: list) -> None:
+    """
+    Regenerates the thumbnails of the given students (their photos changed) and forgets their cached images
+    """
+    get_photo_store().rebuild(get_thumbnails_widths(), ids_std)
+    clear_student_img_cache(ids_std)
+
+
+def clear_student_img_cache(ids_std: list = None) -> None:
+    """
+    Forgets the cached photos so that they are read again from the disk. Must be called when photos are modified.
+
+    :param ids_std: students whose photo changed, None to clear the whole cache
+    """
+    if ids_std is None:
+        _photo_stores.clear()
+        _photo_files.clear()
+        _load_scaled_img.cache_clear()
+    else:
+        ids_std = set(ids_std)
+        for key in [k for k in _photo_files if k[0] in ids_std]:
+            _photo_files.pop(key)
+
+
 def tr(message: str) -> str:
     return AssetManager.getInstance().get_text(message)
 
@@ -367,12 +504,6 @@ class AssetManager:
         else:
             raise Exception("Use getInstance() to access the unique AssetManager instance")
 
-        # Polulate W3C colors with other custom colors
-        for c in COLOR_DICT1:
-            c1 = "#" + c.lower()
-            if c1 not in COLOR_DICT:
-                COLOR_DICT[c1] = COLOR_DICT1[c] + " *"
-
         # Application's config file
         # Copy config file into home directory
         self.config_path = path.expanduser("~/.SdCrc")
@@ -403,16 +534,61 @@ class AssetManager:
 
             self.save_config(self.__config)
 
+        # In memory config cache, reloaded only when ~/.SdCrc is modified
+        self.__config_mtime = self.__get_config_mtime()
+        self.__last_check = monotonic()
+        self.__typed_cache = {}  # {(type, section, key): value, ...}
+
         language = import_module("assets.languages." + self.__config.get("main", "language"))
         self.__language_dico = language.dico
 
     def save_config(self, config: ConfigParser) -> None:
         """
-        Save the given configuration parser
+        Save the given configuration parser, and use it as the new in memory configuration
         """
         with open(self.config_path, 'w') as configfile:  # write the config file
             config.write(configfile)  # in ~/.SdCrc
 
+        self.__config = ConfigParser()
+        self.__config.read_dict(config)
+        self.__config_mtime = self.__get_config_mtime()
+        self.__last_check = monotonic()
+        self.__typed_cache = {}
+
+    def __get_config_mtime(self) -> float:
+        """
+        Gets the last modification time of the config file, or 0 if it can't be read
+        """
+        try:
+            return stat(self.config_path).st_mtime
+        except OSError:
+            return 0
+
+    def __check_config(self) -> None:
+        """
+        Reloads the config file if it was modified outside the application.
+        The file's mtime is checked at most once every CONFIG_CHECK_DELAY seconds so that frequent lookups (canvas
+        repaints) do not perform any file I/O.
+        """
+        now = monotonic()
+        if now - self.__last_check < CONFIG_CHECK_DELAY:
+            return
+        self.__last_check = now
+
+        mtime = self.__get_config_mtime()
+        if mtime != self.__config_mtime:
+            self.reload_config()
+
+    def reload_config(self) -> None:
+        """
+        Re-reads the config file and drops the typed values cache
+        """
+        self.__config = ConfigParser()
+        self.__config.read(self.config_path)
+        self.__config_mtime = self.__get_config_mtime()
+        self.__last_check = monotonic()
+        self.__typed_cache = {}
+
     def config_to_dico(self, config: ConfigParser) -> dict:
         """
         Converts a configuration parser object into a Python dictionary
@@ -427,10 +603,11 @@ class AssetManager:
 
     def get_config_parser(self) -> ConfigParser:
         """
-        Gets the current config parser
+        Gets a copy of the current config parser. Changes made to it are only applied through save_config()
         """
+        self.__check_config()
         config = ConfigParser()
-        config.read(self.config_path)
+        config.read_dict(self.__config)
         return config
 
     def restore_default_settings(self) -> None:
@@ -458,6 +635,7 @@ class AssetManager:
         """
         AssetManager.__instance = None
         AssetManager()
+        clear_student_img_cache()  # The photos folder may have changed with the settings
         return AssetManager.__instance
 
     def config(self, section: str, key: str) -> str:
@@ -468,11 +646,47 @@ class AssetManager:
         :param key: Section's key
         :return: value
         """
-        return self.get_config_parser().get(section, key)
+        self.__check_config()
+        return self.__config.get(section, key)
+
+    def __typed_config(self, type_key: str, section: str, key: str, convert):
+        """
+        Gets the value of the specified section, key converted with the given function. Converted values are cached
+        until the configuration changes.
+        """
+        self.__check_config()
+        cache_key = (type_key, section, key)
+        if cache_key not in self.__typed_cache:
+            self.__typed_cache[cache_key] = convert(self.__config.get(section, key))
+        return self.__typed_cache[cache_key]
+
+    def config_int(self, section: str, key: str) -> int:
+        """
+        Gets the value of the specified section, key as an integer
+        """
+        return self.__typed_config("int", section, key, int)
+
+    def config_float(self, section: str, key: str) -> float:
+        """
+        Gets the value of the specified section, key as a float
+        """
+        return self.__typed_config("float", section, key, float)
+
+    def config_bool(self, section: str, key: str) -> bool:
+        """
+        Gets the value of the specified section, key as a boolean
+        """
+        return self.__typed_config("bool", section, key, lambda v: self.__config.BOOLEAN_STATES[v.lower()])
+
+    def config_color(self, section: str, key: str) -> QColor:
+        """
+        Gets the value of the specified section, key as a QColor. The returned QColor must not be modified.
+        """
+        return self.__typed_config("color", section, key, QColor)
 
     def bdd_path(self):
         """return the BDD path or None if no bdd is found"""
-        bp = path.expanduser(self.get_config_parser().get("main", "bdd_path"))
+        bp = path.expanduser(self.config("main", "bdd_path"))
         return bp, path.isfile(bp)
 
     def get_text(self, key: str) -> str:
@@ -480,13 +694,55 @@ class AssetManager:
             return self.__language_dico[key]
         return "-_-"
 
+    @staticmethod
+    def version_check_enabled() -> bool:
+        """
+        The release check can be disabled (offline runs, tests) by setting the SDC_NO_VERSION_CHECK environment variable
+        """
+        return environ.get(NO_VERSION_CHECK_ENV, "") in ("", "0")
+
+    def __version_cache_path(self) -> str:
+        return path.join(path.dirname(self.config_path), VERSION_CACHE_FILE)
+
+    def __read_version_cache(self):
+        """
+        Gets the cached latest version, or None if there is no cache or if it is outdated
+        """
+        try:
+            with open(self.__version_cache_path(), 'r') as f:
+                cache = json.load(f)
+            if 0 <= time() - cache["checked"] < VERSION_CACHE_TTL:
+                return cache["version"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def __write_version_cache(self, version: str) -> None:
+        try:
+            with open(self.__version_cache_path(), 'w') as f:
+                json.dump({"checked": time(), "version": version}, f)
+        except OSError:
+            pass
+
     def get_latest_version(self):
+        """
+        Gets the latest released version. The result is cached on disk for VERSION_CACHE_TTL seconds so that most
+        startups do not need any network access.
+        This method may block up to VERSION_CHECK_TIMEOUT seconds, call it from a worker thread.
+        """
+        cached_version = self.__read_version_cache()
+        if cached_version is not None:
+            return cached_version
+
         try:
-            r = requests.get('https://api.github.com/repos/wawachief/SalleDeClasse/releases/latest')
+            import requests  # Not needed before the (background) release check
+            r = requests.get(LATEST_RELEASE_URL, timeout=VERSION_CHECK_TIMEOUT)
             dico = r.json()
             version = dico["tag_name"][1:]
         except :
             version = "0.0.0"
         if version[-2] == "-":
             version = version[:-2]
+        if version != "0.0.0":
+            self.__write_version_cache(version)
         return version
@@ -0,0 +1,161 @@
+# Salle de classe by Lecluse DevCorp
+# Licence GPL-v3 - see LICENCE.txt
+#
+# Students photos thumbnails store
+#
+# Thumbnails are pre-scaled copies of the students photos, stored in the thumbnails/ sub folder of sdc_photos.
+# A manifest file indexes them : {id_std: {"source": file, "mtime": mtime, "thumbnails": {width: {...}}}}
+# so that displays can load small files directly without probing the photos folder.
+#
+# Rebuild the thumbnails of an existing photos folder :
+#     python -m src.photo_store [photos_folder] [width ...]
+
+from concurrent.futures import ThreadPoolExecutor
+from configparser import ConfigParser
+from os import path, makedirs, stat, listdir, replace
+import json
+import sys
+
+THUMBNAILS_FOLDER = "thumbnails"
+MANIFEST_FILE = "manifest.json"
+PHOTO_EXTS = (".png", ".jpg")
+
+
+class PhotoStore:
+
+    def __init__(self, photo_path: str):
+        """
+        Thumbnails store of a photos folder
+
+        :param photo_path: sdc_photos folder
+        """
+        self.photo_path = photo_path
+        self.thumbnails_path = path.join(photo_path, THUMBNAILS_FOLDER)
+        self.__manifest = self.__load_manifest()
+
+    def __manifest_path(self) -> str:
+        return path.join(self.thumbnails_path, MANIFEST_FILE)
+
+    def __load_manifest(self) -> dict:
+        try:
+            with open(self.__manifest_path(), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_manifest(self) -> None:
+        """
+        Writes the manifest file (atomically, through a temporary file)
+        """
+        if not path.isdir(self.thumbnails_path):
+            makedirs(self.thumbnails_path)
+        tmp_path = self.__manifest_path() + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.__manifest, f)
+        replace(tmp_path, self.__manifest_path())
+
+    def source_file(self, id_std: int):
+        """
+        Looks for the original photo of the student (tries with .png and .jpg extensions)
+
+        :return: (file name, mtime) or None if the student has no photo
+        """
+        for ext in PHOTO_EXTS:
+            file_name = str(id_std) + ext
+            try:
+                return file_name, stat(path.join(self.photo_path, file_name)).st_mtime
+            except OSError:
+                pass
+        return None
+
+    def get_thumbnail(self, id_std: int, width: int):
+        """
+        Gets the thumbnail of the given width from the manifest. The source photo is checked (stat) so that a photo
+        replaced outside of the application does not serve a stale thumbnail.
+
+        :return: (thumbnail path, source mtime) or None if there is no such up to date thumbnail
+        """
+        entry = self.__manifest.get(str(id_std))
+        if entry is None:
+            return None
+        thumb = entry["thumbnails"].get(str(width))
+        if thumb is None:
+            return None
+        if self.source_file(id_std) != (entry["source"], entry["mtime"]):
+            return None  # The photo changed (or was removed) since the thumbnail was generated
+        return path.join(self.thumbnails_path, thumb["file"]), entry["mtime"]
+
+    def make_thumbnails(self, id_std: int, widths: list):
+        """
+        Generates the thumbnails of the student's photo at the given widths.
+        Does not modify the manifest, so it can safely run in a worker thread.
+
+        :return: manifest entry or None if the student has no photo
+        """
+        from PIL import Image
+
+        source = self.source_file(id_std)
+        if source is None:
+            return None
+        file_name, mtime = source
+
+        thumbnails = dict()
+        with Image.open(path.join(self.photo_path, file_name)) as img:
+            img = img.convert("RGB")
+            for width in set(widths):
+                height = max(1, round(img.height * width / img.width))
+                thumb_name = f"{id_std}_{width}.png"
+                img.resize((width, height), Image.LANCZOS).save(path.join(self.thumbnails_path, thumb_name))
+                thumbnails[str(width)] = {"file": thumb_name, "width": width, "height": height}
+
+        return {"source": file_name, "mtime": mtime, "thumbnails": thumbnails}
+
+    def rebuild(self, widths: list, ids_std: list = None, max_workers: int = None) -> int:
+        """
+        (Re)generates thumbnails in parallel and saves the manifest
+
+        :param widths: thumbnails widths
+        :param ids_std: students to process, None for all the photos of the folder
+        :param max_workers: number of worker threads, None for the default pool size
+        :return: number of students with a thumbnail
+        """
+        if not path.isdir(self.thumbnails_path):
+            makedirs(self.thumbnails_path)
+
+        if ids_std is None:
+            ids_std = sorted({int(path.splitext(f)[0]) for f in listdir(self.photo_path)
+                              if path.splitext(f)[1] in PHOTO_EXTS and path.splitext(f)[0].isdigit()})
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            entries = list(executor.map(lambda i: self.make_thumbnails(i, widths), ids_std))
+
+        for id_std, entry in zip(ids_std, entries):
+            if entry is None:
+                self.__manifest.pop(str(id_std), None)
+            else:
+                self.__manifest[str(id_std)] = entry
+        self.save_manifest()
+
+        return len([e for e in entries if e is not None])
+
+
+def default_widths() -> list:
+    """
+    Thumbnails widths read from the user's settings (or from the default config file)
+    """
+    config = ConfigParser()
+    config.read(["config.ini", path.expanduser("~/.SdCrc")])
+    return [config.getint("photos", "photo_width")]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        folder = sys.argv[1]
+    else:
+        conf = ConfigParser()
+        conf.read(["config.ini", path.expanduser("~/.SdCrc")])
+        folder = path.expanduser(conf.get("main", "bdd_path").replace("sdc_db", "/sdc_photos/"))
+    thumbnails_widths = [int(w) for w in sys.argv[2:]] or default_widths()
+
+    nb = PhotoStore(folder).rebuild(thumbnails_widths)
+    print(f"{nb} photos processed in {folder} (widths: {thumbnails_widths})")
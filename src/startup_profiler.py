@@ -0,0 +1,113 @@
+# Salle de classe by Lecluse DevCorp
+# Licence GPL-v3 - see LICENCE.txt
+#
+# Startup profiler
+# Enabled with the --profile-startup command line option or the SDC_PROFILE_STARTUP environment variable.
+# Times each phase of the application start and writes a table in ~/sdc.log (and on stdout).
+
+import logging
+from contextlib import contextmanager
+from os import environ
+from time import perf_counter
+
+PROFILE_STARTUP_ARG = "--profile-startup"
+PROFILE_STARTUP_ENV = "SDC_PROFILE_STARTUP"
+
+
+class StartupProfiler:
+    __instance = None
+
+    def __init__(self):
+        if StartupProfiler.__instance is None:
+            StartupProfiler.__instance = self
+        else:
+            raise Exception("Use getInstance() to access the unique StartupProfiler instance")
+
+        self.enabled = False
+        self.logger = logging.getLogger("STARTUP")
+
+        self.__phases = []  # Recorded phases [(depth, name, duration in s), ...]
+        self.__depth = 0  # Current nesting depth
+        self.__lap_start = None  # Start time of the current lap
+        self.__reported = False  # Once the report is written, late phases are logged one by one
+
+    @staticmethod
+    def getInstance():
+        """
+        :rtype: StartupProfiler
+        """
+        if StartupProfiler.__instance is None:
+            StartupProfiler()
+        return StartupProfiler.__instance
+
+    def enable(self, argv: list) -> None:
+        """
+        Enables the profiler if asked on the command line (the option is removed from argv) or by the environment
+        """
+        if PROFILE_STARTUP_ARG in argv:
+            argv.remove(PROFILE_STARTUP_ARG)
+            self.enabled = True
+        elif environ.get(PROFILE_STARTUP_ENV, "") not in ("", "0"):
+            self.enabled = True
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Context manager timing the enclosed block as a startup phase. Phases can be nested.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        index = len(self.__phases)
+        self.__phases.append((self.__depth, name, 0))
+        self.__depth += 1
+        start = perf_counter()
+        self.__lap_start = start
+        try:
+            yield
+        finally:
+            self.__depth -= 1
+            self.__phases[index] = (self.__depth, name, perf_counter() - start)
+            self.__lap_start = perf_counter()
+
+    def lap(self, name: str) -> None:
+        """
+        Records the time elapsed since the beginning of the current phase or since the previous lap
+        """
+        if not self.enabled:
+            return
+        now = perf_counter()
+        if self.__lap_start is not None:
+            self.record(name, now - self.__lap_start)
+        self.__lap_start = now
+
+    def record(self, name: str, duration: float) -> None:
+        """
+        Records a phase timed elsewhere (in a worker thread for instance)
+        """
+        if not self.enabled:
+            return
+        if self.__reported:
+            self.__write(f"{name:<45}{duration * 1000:>10.1f}")
+        else:
+            self.__phases.append((self.__depth, name, duration))
+
+    def report(self) -> None:
+        """
+        Writes the timings table and resets the recorded phases
+        """
+        if not self.enabled:
+            return
+        lines = [f"{'phase':<45}{'time [ms]':>10}"]
+        for depth, name, duration in self.__phases:
+            lines.append(f"{'  ' * depth + name:<45}{duration * 1000:>10.1f}")
+        for line in lines:
+            self.__write(line)
+
+        self.__phases = []
+        self.__reported = True
+
+    def __write(self, line: str) -> None:
+        self.logger.info(line)
+        print(line)
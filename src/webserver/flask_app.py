@@ -2,13 +2,15 @@
 # file author : Nicolas Lecluse
 # Licence GPL-v3 - see LICENCE.txt
 
-import sqlite3
+from contextlib import contextmanager
 
 from PySide2.QtCore import QThread
 from flask import Flask, render_template, request, jsonify
 from src.Controllers.main_controller import MainController
 from src.assets_manager import AssetManager
+from src.Model.bdd_connection import ConnectionPool
 from src.Model.mod_bdd import ModBdd
+from src.Model.mod_types import Student
 from flask_socketio import SocketIO
 from random import choice
 import os, signal, sys
@@ -20,15 +22,17 @@ flask_app.config['SECRET_KEY'] = 'secret!'
 Payload.max_decode_packets = 50
 socket_io = SocketIO(flask_app,  async_mode="eventlet")
 controller: MainController = None
+bdd_pool: ConnectionPool = None
 clients = []
 
 
 @flask_app.route('/mobile')
 def load_app_mobile():
     active_course = controller.id_course
-    mod_bdd = get_bdd_connection()
-    active_course_name = mod_bdd.get_course_name_by_id(active_course)
-    students = mod_bdd.get_students_in_course_by_id(active_course)
+    with bdd_connection() as mod_bdd:
+        active_course_name = mod_bdd.get_course_name_by_id(active_course)
+        students = [Student(d.id_student, d.firstname, d.lastname)
+                    for d in mod_bdd.get_course_snapshot(active_course) if d.id_student]
     controller.sig_close_qr.emit()
     return render_template('salle_de_classe_mobile.html', titre="Liste des élèves de la classe " + active_course_name,
                            students=students)
@@ -57,6 +61,8 @@ def handle_disconnect():
 @socket_io.on('stop-server')
 def stop_server():
     controller.flask_server.stop_flask()
+    if bdd_pool is not None:
+        bdd_pool.close()
     if sys.platform == "darwin":
         os.kill(os.getpid(), signal.SIGKILL)
     else:
@@ -65,10 +71,10 @@ def stop_server():
 
 @socket_io.on('confirm_connect')
 def confirm_connection_event(json):
-    mod_bdd = get_bdd_connection()
     ids = controller.v_canvas.get_selected_tiles()
-    for desk_id in ids:
-        student = mod_bdd.get_student_by_desk_id(desk_id)
+    with bdd_connection() as mod_bdd:
+        students = [mod_bdd.get_student_by_desk_id(desk_id) for desk_id in ids]
+    for student in students:
         send_student_selection(student.id, True)
 
 
@@ -79,12 +85,11 @@ def on_selection_changed(json):
 
 @socket_io.on('random_selection')
 def random_selection_request():
-    mod_bdd = get_bdd_connection()
-    desks_id = controller.course_ctrl.get_unselected_occupied_desks_id(bdd=mod_bdd)
-    if desks_id:
+    with bdd_connection() as mod_bdd:
+        desks_id = controller.course_ctrl.get_unselected_occupied_desks_id(bdd=mod_bdd)
+        student = mod_bdd.get_student_by_desk_id(choice(desks_id)) if desks_id else None
+    if student is not None:
         # should be always be true otherwise the hutton is disabled
-        desk_id = choice(desks_id)
-        student = mod_bdd.get_student_by_desk_id(desk_id)
         controller.sig_flask_desk_selection_changed.emit(student.id, True)
         send_student_selection(student.id, True)
 
@@ -93,10 +98,19 @@ def send_student_selection(student_id: int, selected: bool):
     socket_io.emit('select_student', {"id": student_id, "selected": selected})
 
 
-def get_bdd_connection():
+@contextmanager
+def bdd_connection():
+    """
+    Gives a model working on a connection of the web server pool for the duration of the block
+    """
+    global bdd_pool
     bdd_path, _ = AssetManager.getInstance().bdd_path()
-    bdd = sqlite3.connect(bdd_path)
-    return ModBdd(bdd)
+    if bdd_pool is None or bdd_pool.bdd_path != bdd_path:  # The database may change when the application reboots
+        if bdd_pool is not None:
+            bdd_pool.close()
+        bdd_pool = ConnectionPool(bdd_path)
+    with bdd_pool.connection() as bdd:
+        yield ModBdd(bdd)
 
 
 class FlaskThread(QThread):